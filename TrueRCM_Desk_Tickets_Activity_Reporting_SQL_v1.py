@@ -1,7 +1,14 @@
 import os
+import argparse
+import copy
+import json
 import logging
+import shutil
 import time
-from datetime import datetime, timedelta
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from urllib.parse import quote
 import mysql.connector
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -10,9 +17,15 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 import psutil
-import win32com.client
 import humanize  # type: ignore # For human-readable file sizes
+from activity_categories import ACTIVITY_CATEGORIES, categorize_activity
+from analytics_cache import analytics_cache_dir, sync_analytics_cache
+from desk_db import get_db_connection
+from feed_timestamps import as_date, as_datetime, parse_feed_timestamp
+from run_history import RunRecorder, timed_stage
+from schema_migrations import DATA_VERSION_BUMP_SQL, INGEST_CHECKPOINT_SAVE_SQL, apply_migrations, hourly_rollup_sql
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -25,13 +38,130 @@ chrome_options.add_argument("--log-level=3")
 chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
 chrome_options.add_argument("--headless")
 
+# Feed selectors
+FEED_ITEM_SELECTOR = ".activity-group__list-item"
+FEED_NAME_SELECTOR = ".user-info__user-name"
+FEED_EVENT_SELECTOR = ".user-info__event-name"
+FEED_DATE_SELECTOR = ".activity-group__list-item-content--date span"
+FEED_TICKET_SELECTOR = "a.details__ticket-subject"
+
+# Activity counter columns shared by TeamWiseSummary and DateWiseSummary
+ACTIVITY_COLUMNS = ACTIVITY_CATEGORIES
+
+# Returns [loaded item count, aria-label of the last (oldest) loaded item].
+# Items already harvested and removed by FEED_HARVEST_SCRIPT still count as loaded.
+FEED_STATE_SCRIPT = f"""
+const names = document.querySelectorAll('{FEED_NAME_SELECTOR}');
+const dates = document.querySelectorAll('{FEED_DATE_SELECTOR}');
+const last = dates.length ? dates[dates.length - 1].getAttribute('aria-label') : null;
+return [names.length + (window.__deskFeedRemoved || 0), last];
+"""
+
+# Reads one feed item. Each row is read from the item's own container; if the
+# container class is not present we climb from the name node while the ancestor
+# still holds a single item.
+FEED_ROW_JS = f"""
+const containerOf = (nameEl) => {{
+    const item = nameEl.closest('{FEED_ITEM_SELECTOR}');
+    if (item) return item;
+    let node = nameEl.parentElement;
+    while (node && !node.querySelector('{FEED_DATE_SELECTOR}')) {{
+        const parent = node.parentElement;
+        if (!parent || parent.querySelectorAll('{FEED_NAME_SELECTOR}').length > 1) break;
+        node = parent;
+    }}
+    return node;
+}};
+const readRow = (nameEl, item) => {{
+    const pick = (sel) => item ? item.querySelector(sel) : null;
+    const event = pick('{FEED_EVENT_SELECTOR}');
+    const date = pick('{FEED_DATE_SELECTOR}');
+    const link = pick('{FEED_TICKET_SELECTOR}');
+    return [
+        nameEl.getAttribute('title'),
+        event ? event.getAttribute('title') : null,
+        date ? date.getAttribute('aria-label') : null,
+        link ? link.href : null,
+    ];
+}};
+"""
+
+# Returns one [name, activity_type, aria_label, ticket_url] row per feed item.
+FEED_EXTRACT_SCRIPT = FEED_ROW_JS + f"""
+const rows = [];
+for (const nameEl of document.querySelectorAll('{FEED_NAME_SELECTOR}')) {{
+    rows.push(readRow(nameEl, containerOf(nameEl)));
+}}
+return rows;
+"""
+
+# Removes harvested items from the DOM except the newest `keep` ones at the bottom,
+# which keep the scroll position and the oldest date for the high-water check.
+FEED_PRUNE_JS = """
+const pruneHarvested = (harvested, keep) => {
+    const removable = harvested.slice(0, Math.max(0, harvested.length - keep));
+    for (const node of removable) node.remove();
+    window.__deskFeedRemoved = (window.__deskFeedRemoved || 0) + removable.length;
+};
+"""
+
+# Returns rows (as FEED_EXTRACT_SCRIPT) for items not harvested yet, marks them
+# harvested and prunes all but the newest arguments[0] harvested items.
+FEED_HARVEST_SCRIPT = FEED_ROW_JS + FEED_PRUNE_JS + f"""
+const keep = arguments[0];
+const rows = [];
+const harvested = [];
+for (const nameEl of document.querySelectorAll('{FEED_NAME_SELECTOR}')) {{
+    const item = containerOf(nameEl);
+    if (!nameEl.hasAttribute('data-desk-harvested')) {{
+        rows.push(readRow(nameEl, item));
+        nameEl.setAttribute('data-desk-harvested', '1');
+    }}
+    harvested.push(item || nameEl);
+}}
+pruneHarvested(harvested, keep);
+return rows;
+"""
+
+# The html strategy's half of a harvest: marks the first arguments[0] unharvested
+# items (the ones just parsed from page_source; anything loaded since is later in
+# the feed and left for the next batch) and prunes as FEED_HARVEST_SCRIPT does.
+FEED_MARK_SCRIPT = FEED_ROW_JS + FEED_PRUNE_JS + f"""
+const count = arguments[0];
+const keep = arguments[1];
+let marked = 0;
+const harvested = [];
+for (const nameEl of document.querySelectorAll('{FEED_NAME_SELECTOR}')) {{
+    if (!nameEl.hasAttribute('data-desk-harvested')) {{
+        if (marked === count) break;
+        nameEl.setAttribute('data-desk-harvested', '1');
+        marked++;
+    }}
+    harvested.push(containerOf(nameEl) || nameEl);
+}}
+pruneHarvested(harvested, keep);
+"""
+
+# How feed items are read: 'script' runs FEED_EXTRACT_SCRIPT in the browser,
+# 'html' parses a page_source snapshot in Python (see feed_parser)
+EXTRACTION_STRATEGIES = ("script", "html")
+
 # Helper Functions
-def initialize_browser():
-    """Initialize the Chrome WebDriver."""
+def initialize_browser(profile_dir=None):
+    """
+    Initialize the Chrome WebDriver.
+    Args:
+        profile_dir: Optional persistent Chrome user-data directory; sessions (and the
+            portal login) survive between runs when it is reused.
+    """
     try:
         driver_path = r"C:\Automation\chromedriver.exe"
         service = Service(driver_path)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        options = chrome_options
+        if profile_dir:
+            options = copy.deepcopy(chrome_options)
+            options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+        driver = webdriver.Chrome(service=service, options=options)
         driver.maximize_window()
         logging.info("WebDriver initialized successfully.")
         return driver
@@ -40,22 +170,6 @@ def initialize_browser():
         return None
 
 
-def get_db_connection():
-    """Establish database connection."""
-    try:
-        connection = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="SubhanAllah@1DB",
-            database="TicketActivityDB"
-        )
-        logging.info("Database connection established.")
-        return connection
-    except mysql.connector.Error as err:
-        logging.error(f"Database connection error: {err}")
-        return None
-
-
 def get_config_details_from_db(connection):
     """Fetch configuration details from ConfigSetup table."""
     try:
@@ -85,58 +199,586 @@ def fetch_valid_names(connection):
         return []
 
 
-def trigger_load_more(driver, max_attempts=10, pause_time=10):
-    """Simulate pressing PageDown repeatedly to load more content."""
-    logging.info("Simulating PageDown key presses to load more content.")
+def fetch_high_water_mark(connection):
+    """
+    Fetch the DateTimeStamp the last complete run reached (IngestCheckpoint), falling
+    back to the latest DateTimeStamp stored in ExtractedActivities.
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT COALESCE(
+                (SELECT high_water_mark FROM IngestCheckpoint WHERE id = 1),
+                (SELECT MAX(DateTimeStamp) FROM ExtractedActivities)
+            );
+        """)
+        high_water_mark = cursor.fetchone()[0]
+        cursor.close()
+        if isinstance(high_water_mark, str):
+            high_water_mark = as_datetime(high_water_mark)
+        logging.info(f"High-water mark of the last complete run: {high_water_mark}")
+        return high_water_mark
+    except Exception as e:
+        logging.error(f"Error fetching high-water mark: {e}")
+        return None
+
+
+def feed_state(driver):
+    """
+    Return (item_count, oldest_aria_label) for the feed currently loaded in the DOM.
+    Both values come from a single execute_script round trip.
+    """
+    return driver.execute_script(FEED_STATE_SCRIPT)
+
+
+def oldest_loaded_timestamp(aria_label):
+    """Parse the aria-label of the last (oldest) loaded feed item, or return None."""
+    if not aria_label:
+        return None
+    try:
+        return parse_feed_timestamp(aria_label)
+    except ValueError as e:
+        logging.warning(f"Could not parse oldest feed timestamp: {e}")
+        return None
+
+
+def scroll_feed(driver, max_attempts=1000, growth_timeout=10, max_idle_scrolls=3,
+                poll_frequency=0.25, stop_before=None, yield_every=None):
+    """
+    Scroll the activity feed until it stops growing.
+
+    After every scroll the engine waits (up to growth_timeout seconds) for the
+    number of loaded feed items to increase instead of sleeping a fixed time.
+    Scrolling stops when max_idle_scrolls scrolls in a row produce no growth,
+    when max_attempts is reached, or (incremental mode) once the oldest loaded
+    item is older than stop_before.
+
+    This is a generator: it yields the number of scrolls so far after every
+    yield_every scrolls (never when None), letting the caller harvest items
+    between batches, and returns the stats dict when scrolling stops.
+    Args:
+        driver: Selenium WebDriver on the activity feed.
+        max_attempts: Upper bound on the number of scrolls.
+        growth_timeout: Seconds to wait for new items after each scroll.
+        max_idle_scrolls: Consecutive scrolls without growth before giving up.
+        poll_frequency: Seconds between DOM checks while waiting.
+        stop_before: Optional datetime high-water mark.
+        yield_every: Scrolls per batch.
+    Returns:
+        dict with scrolls, items, idle_scrolls, wait_seconds, elapsed_seconds,
+        items_per_second and stop_reason.
+    """
+    logging.info("Scrolling the activity feed until it stops growing.")
     body = driver.find_element(By.TAG_NAME, "body")  # Ensure the page is focused
-    click_element_time = driver.find_element(By.XPATH, '//*[@id="app"]/div/div[1]/div/div/div/div/div[2]/div/h4')
-    time.sleep(pause_time)
+    click_element_time = WebDriverWait(driver, growth_timeout).until(
+        EC.element_to_be_clickable((By.XPATH, '//*[@id="app"]/div/div[1]/div/div/div/div/div[2]/div/h4'))
+    )
     click_element_time.click()
-    for attempt in range(max_attempts):
-        body.send_keys(Keys.PAGE_DOWN)
-        time.sleep(pause_time)
-        elements = driver.find_elements(By.CSS_SELECTOR, ".user-info__user-name")
-        current_count = len(elements)
-        logging.info(f"Total elements loaded: {current_count} after {attempt + 1} scrolls.")
+
+    start_time = time.perf_counter()
+    initial_count, oldest_label = feed_state(driver)
+    previous_count = initial_count
+    wait_seconds = 0.0
+    idle_scrolls = 0
+    scrolls = 0
+    stop_reason = "max_attempts"
+
+    def feed_grew(d):
+        count, label = feed_state(d)
+        return (count, label) if count > previous_count else False
+
+    for _ in range(max_attempts):
+        body.send_keys(Keys.END)
+        scrolls += 1
+        wait_start = time.perf_counter()
+        try:
+            current_count, oldest_label = WebDriverWait(
+                driver, growth_timeout, poll_frequency=poll_frequency
+            ).until(feed_grew)
+            idle_scrolls = 0
+        except TimeoutException:
+            current_count, oldest_label = feed_state(driver)
+            idle_scrolls += 1
+        wait_seconds += time.perf_counter() - wait_start
+
+        logging.info(f"Total elements loaded: {current_count} after {scrolls} scrolls "
+                     f"(+{current_count - previous_count}, idle streak {idle_scrolls}).")
+        previous_count = current_count
+
+        if stop_before is not None:
+            oldest = oldest_loaded_timestamp(oldest_label)
+            if oldest is not None and oldest < stop_before:
+                logging.info(f"Reached already-ingested activity ({oldest} < {stop_before}); stopping scroll.")
+                stop_reason = "high_water_mark"
+                break
+        if idle_scrolls >= max_idle_scrolls:
+            logging.info(f"Feed stopped growing after {idle_scrolls} idle scrolls; assuming it is exhausted.")
+            stop_reason = "exhausted"
+            break
+        if yield_every and scrolls % yield_every == 0:
+            yield scrolls
+
+    elapsed_seconds = time.perf_counter() - start_time
+    items_loaded = previous_count - initial_count
+    stats = {
+        "scrolls": scrolls,
+        "items": previous_count,
+        "idle_scrolls": idle_scrolls,
+        "wait_seconds": round(wait_seconds, 2),
+        "elapsed_seconds": round(elapsed_seconds, 2),
+        "items_per_second": round(items_loaded / elapsed_seconds, 2) if elapsed_seconds else 0.0,
+        "stop_reason": stop_reason,
+    }
+    logging.info(
+        f"Scroll finished ({stop_reason}): {scrolls} scrolls, {previous_count} items "
+        f"({items_loaded} new, {stats['items_per_second']} items/s), "
+        f"{stats['wait_seconds']}s waiting for growth, {stats['elapsed_seconds']}s total."
+    )
+    return stats
+
+
+def trigger_load_more(driver, **kwargs):
+    """
+    Scroll the whole feed into the DOM in one go (see scroll_feed for the arguments).
+    Returns:
+        The scroll stats dict.
+    """
+    steps = scroll_feed(driver, **kwargs)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def browser_rss_bytes(driver):
+    """Resident memory of chromedriver and every Chrome process it started, in bytes."""
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return 0
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return total
+
+
+def stream_activity_batches(driver, since=None, batch_scrolls=20, keep_items=5, max_attempts=1000, stats=None,
+                            recorder=None, extraction="script"):
+    """
+    Scroll the feed and yield its activity records in batches as they load.
+    After every batch_scrolls scrolls the newly loaded items are read and all but the
+    last keep_items harvested nodes are removed from the DOM, so browser memory stays
+    flat however long the feed is, and a failure loses at most the batch in flight.
+    Args:
+        driver: Selenium WebDriver on the activity feed.
+        since: Optional high-water mark datetime (see extract_activity_data).
+        batch_scrolls: Scrolls between harvests.
+        keep_items: Harvested items left in the DOM as the scroll anchor.
+        max_attempts: Upper bound on the number of scrolls.
+        stats: Optional dict; filled with the scroll stats plus batches, records and
+            peak_browser_rss once the feed is exhausted.
+        recorder: Optional RunRecorder; scrolling and harvesting are timed as the
+            'scroll' and 'extract' stages.
+        extraction: 'script' or 'html' (see collect_feed_items).
+    Yields:
+        Lists of activity records (see build_activity_records).
+    """
+    stats = stats if stats is not None else {}
+    steps = scroll_feed(driver, max_attempts=max_attempts, stop_before=since, yield_every=batch_scrolls)
+    batches = records = peak_rss = 0
+    done = False
+    while not done:
+        with timed_stage(recorder, "scroll"):
+            try:
+                next(steps)
+            except StopIteration as stop:
+                stats.update(stop.value)
+                done = True
+        with timed_stage(recorder, "extract") as stage:
+            items = harvest_feed_items(driver, keep_items, extraction)
+            data, skipped, incomplete = build_activity_records(items, since=since)
+            stage["rows"] = len(data)
+        rss = browser_rss_bytes(driver)
+        peak_rss = max(peak_rss, rss)
+        logging.info(
+            f"Harvested batch {batches + 1}: {len(data)} records from {len(items)} new feed items "
+            f"({skipped} older than the high-water mark, {incomplete} incomplete); "
+            f"browser RSS {humanize.naturalsize(rss)}."
+        )
+        batches += 1
+        records += len(data)
+        if data:
+            yield data
+    stats.update(batches=batches, records=records, peak_browser_rss=peak_rss)
+    logging.info(f"Streamed {records} records in {batches} batches; peak browser RSS {humanize.naturalsize(peak_rss)}.")
+
+
+def collect_feed_items(driver, extraction="script"):
+    """
+    Collect [name, activity_type, aria_label, ticket_url] for every loaded feed item
+    in a single round trip. Fields are paired per item container, so a missing field
+    yields None for that item instead of shifting later columns.
+    Args:
+        driver: Selenium WebDriver on the activity feed.
+        extraction: 'script' to read the DOM with FEED_EXTRACT_SCRIPT, or 'html' to
+            parse driver.page_source offline (same rows, see feed_parser).
+    """
+    if extraction == "html":
+        from feed_parser import parse_feed_html  # lxml is only needed for this strategy
+
+        return parse_feed_html(driver.page_source, base_url=driver.current_url)
+    return driver.execute_script(FEED_EXTRACT_SCRIPT)
+
+
+def harvest_feed_items(driver, keep_items=5, extraction="script"):
+    """
+    Collect the feed items loaded since the last harvest and prune older ones from the DOM.
+    Args:
+        driver: Selenium WebDriver on the activity feed.
+        keep_items: Harvested items left in the DOM as the scroll anchor.
+        extraction: 'script' or 'html' (see collect_feed_items).
+    """
+    if extraction == "html":
+        from feed_parser import parse_feed_html
+
+        items = parse_feed_html(driver.page_source, base_url=driver.current_url, skip_harvested=True)
+        driver.execute_script(FEED_MARK_SCRIPT, len(items), keep_items)
+        return items
+    return driver.execute_script(FEED_HARVEST_SCRIPT, keep_items)
 
 
-def extract_activity_data(driver):
-    """Extract activity data from the webpage."""
+def build_activity_records(items, since=None):
+    """
+    Turn raw feed items from collect_feed_items into ExtractedActivities records.
+    Args:
+        items: Iterable of [name, activity_type, aria_label, ticket_url].
+        since: Optional datetime; items older than this are skipped.
+    Returns:
+        (records, skipped, incomplete) where skipped counts items older than since
+        and incomplete counts items missing a field or carrying an unparsable date.
+        Date, Time and DateTimeStamp are date, time and datetime values.
+    """
+    data = []
+    skipped = 0
+    incomplete = 0
+    for name, activity_type, aria_label, ticket_url in items:
+        if not (name and activity_type and aria_label and ticket_url):
+            incomplete += 1
+            continue
+        try:
+            activity_time = parse_feed_timestamp(aria_label)
+        except ValueError:
+            logging.warning(f"Skipping feed item with unparsable date: {aria_label!r}")
+            incomplete += 1
+            continue
+        if since is not None and activity_time < since:
+            skipped += 1
+            continue
+        data.append({
+            "Name": name,
+            "ActivityType": activity_type,
+            "ActivityCategory": categorize_activity(activity_type),
+            "Date": activity_time.date(),
+            "Time": activity_time.time(),
+            "DateTimeStamp": activity_time,
+            "TicketUrl": ticket_url
+        })
+    return data, skipped, incomplete
+
+
+def extract_activity_data(driver, since=None, extraction="script"):
+    """
+    Extract activity data from the webpage.
+    Args:
+        driver: Selenium WebDriver on the activity feed.
+        since: Optional datetime; only items at or after this timestamp are returned.
+            Items sharing the high-water second are kept and de-duplicated by the
+            unique key on insert, so none are lost at the boundary.
+        extraction: 'script' or 'html' (see collect_feed_items).
+    """
     try:
         WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CLASS_NAME, "user-info__user-name"))
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, FEED_NAME_SELECTOR))
         )
-        data = []
-        names = driver.find_elements(By.CSS_SELECTOR, ".user-info__user-name")
-        activity_types = driver.find_elements(By.CSS_SELECTOR, ".user-info__event-name")
-        times = driver.find_elements(By.CSS_SELECTOR, ".activity-group__list-item-content--date span")
-        ticket_links = driver.find_elements(By.CSS_SELECTOR, "a.details__ticket-subject")
-
-        for i in range(len(names)):
-            name = names[i].get_attribute("title")
-            activity_type = activity_types[i].get_attribute("title")
-            aria_label = times[i].get_attribute("aria-label")
-            date, time_val = aria_label.split(", ")
-            datetime_stamp = datetime.strptime(f"{date} {time_val}", "%B %dth %Y %H:%M:%S").strftime("%Y-%m-%d %H:%M:%S")
-            ticket_url = ticket_links[i].get_attribute("href")
-            data.append({
-                "Name": name,
-                "ActivityType": activity_type,
-                "Date": datetime.strptime(date, "%B %dth %Y").strftime("%Y-%m-%d"),
-                "Time": time_val,
-                "DateTimeStamp": datetime_stamp,
-                "TicketUrl": ticket_url,
-                "TimeSinceLast Activity": str(datetime.now() - datetime.strptime(f"{date} {time_val}", "%B %dth %Y %H:%M:%S")).split(".")[0]
-            })
-        logging.info(f"Extracted {len(data)} rows of data.")
+        start_time = time.perf_counter()
+        items = collect_feed_items(driver, extraction)
+        collected_time = time.perf_counter()
+        data, skipped, incomplete = build_activity_records(items, since=since)
+        logging.info(
+            f"Extracted {len(data)} rows of data from {len(items)} feed items "
+            f"(collect {collected_time - start_time:.2f}s, parse {time.perf_counter() - collected_time:.2f}s)."
+        )
+        if since is not None:
+            logging.info(f"Skipped {skipped} already-ingested rows older than {since}.")
+        if incomplete:
+            logging.warning(f"Skipped {incomplete} feed items with missing or invalid fields.")
         return data
     except Exception as e:
         logging.error(f"Error extracting data: {e}")
         return []
 
 
+def submit_login_form(driver, login_email, login_password):
+    """Fill in and submit the portal login form on the current page."""
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "loginemail"))).send_keys(login_email)
+    password_field = driver.find_element(By.ID, "loginpassword")
+    password_field.send_keys(login_password)
+    password_field.send_keys(Keys.RETURN)
+
+
+def load_session_cookies(driver, cookie_file):
+    """Add cookies saved by save_session_cookies to the current domain. Returns the count added."""
+    try:
+        with open(cookie_file, encoding="utf-8") as f:
+            cookies = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    added = 0
+    for cookie in cookies:
+        cookie.pop("sameSite", None)  # Chrome rejects some stored sameSite values on re-add
+        try:
+            driver.add_cookie(cookie)
+            added += 1
+        except Exception as e:
+            logging.warning(f"Could not restore cookie {cookie.get('name')}: {e}")
+    return added
+
+
+def save_session_cookies(driver, cookie_file):
+    """
+    Write the browser's cookies for the current domain to cookie_file as JSON.
+    The file is replaced atomically, so parallel workers that log in at the same time
+    never leave it half written; the last writer wins.
+    """
+    temp_file = f"{cookie_file}.{os.getpid()}.tmp"
+    try:
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(driver.get_cookies(), f)
+        os.replace(temp_file, cookie_file)
+        logging.info(f"Saved session cookies to {cookie_file}.")
+    except OSError as e:
+        logging.error(f"Error saving session cookies: {e}")
+
+
+def open_feed(driver, base_url, login_email, login_password, cookie_file=None, timeout=10):
+    """
+    Land on the activity feed, reusing the browser profile's session or saved cookies
+    when they are still valid and falling back to the login form when they are not.
+    Args:
+        driver: Selenium WebDriver (optionally started with a persistent profile_dir).
+        base_url: Portal URL that shows the feed once signed in.
+        login_email, login_password: Credentials for the login form fallback.
+        cookie_file: Optional JSON file of session cookies to restore and refresh.
+        timeout: Seconds to wait for either the feed or the login form.
+    Returns:
+        'warm' if an existing session was reused, 'cold' if the form had to be submitted.
+    """
+    driver.get(base_url)
+    if cookie_file and os.path.exists(cookie_file) and load_session_cookies(driver, cookie_file):
+        driver.get(base_url)
+
+    def feed_or_login_form(d):
+        if d.find_elements(By.CSS_SELECTOR, FEED_NAME_SELECTOR):
+            return "feed"
+        if d.find_elements(By.ID, "loginemail"):
+            return "login"
+        return False
+
+    if WebDriverWait(driver, timeout).until(feed_or_login_form) == "feed":
+        logging.info("Reused the existing portal session.")
+        return "warm"
+
+    logging.info("No valid session; signing in with the login form.")
+    submit_login_form(driver, login_email, login_password)
+    WebDriverWait(driver, timeout).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, FEED_NAME_SELECTOR)))
+    if cookie_file:
+        save_session_cookies(driver, cookie_file)
+    return "cold"
+
+
+def scrape_feed(driver, since=None, url=None, extraction="script"):
+    """
+    Scroll a feed down to the high-water mark and extract its activities.
+    Args:
+        driver: Logged-in Selenium WebDriver.
+        since: Optional high-water mark datetime (see extract_activity_data).
+        url: Feed page to open first; the current page is used when None.
+        extraction: 'script' or 'html' (see collect_feed_items).
+    Returns:
+        (records, stats from stream_activity_batches).
+    """
+    if url:
+        driver.get(url)
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, FEED_NAME_SELECTOR))
+        )
+    stats = {}
+    records = [row for batch in stream_activity_batches(driver, since=since, stats=stats, extraction=extraction)
+               for row in batch]
+    return records, stats
+
+
+def is_date_shard_template(shard_url):
+    """True if shard_url splits the feed by day ({start}/{end}) rather than by agent."""
+    return "{agent}" not in shard_url
+
+
+def build_shard_urls(shard_url, since=None, agents=(), shard_days=7, start=None):
+    """
+    Expand a feed URL template into one URL per shard.
+    Args:
+        shard_url: Template containing {agent} (one shard per agent), or {start} and/or
+            {end} (one shard per day, as YYYY-MM-DD) for portals that filter the feed.
+        since: High-water mark; date shards start at its day.
+        agents: Agent names for {agent} templates.
+        shard_days: Days covered by date shards when there is no high-water mark.
+        start: First day of date shards (a date); overrides since and shard_days.
+    """
+    if not is_date_shard_template(shard_url):
+        return [shard_url.format(agent=quote(agent)) for agent in sorted(set(agents))]
+    today = datetime.now().date()
+    if start is not None:
+        first_day = start
+    elif since:
+        first_day = since.date()
+    else:
+        first_day = today - timedelta(days=shard_days - 1)
+    days = [first_day + timedelta(days=i) for i in range((today - first_day).days + 1)]
+    if days:
+        logging.info(f"Date shards cover {days[0].isoformat()} to {days[-1].isoformat()} ({len(days)} days).")
+    # Newest days first so the busiest shards start early
+    return [shard_url.format(start=day.isoformat(), end=day.isoformat()) for day in reversed(days)]
+
+
+def merge_activity_records(batches):
+    """
+    Merge per-shard record lists, dropping duplicates of the ExtractedActivities identity
+    (Name, ActivityType, DateTimeStamp, TicketUrl) seen in overlapping shards.
+    Returns:
+        (records, duplicates)
+    """
+    merged = {}
+    duplicates = 0
+    for batch in batches:
+        for row in batch:
+            key = (row["Name"], row["ActivityType"], row["DateTimeStamp"], row["TicketUrl"])
+            if key in merged:
+                duplicates += 1
+            else:
+                merged[key] = row
+    return list(merged.values()), duplicates
+
+
+# Lock files of a running Chrome and caches not worth copying into a worker's profile
+PROFILE_COPY_IGNORE = shutil.ignore_patterns(
+    "Singleton*", "lockfile", "Cache", "Code Cache", "GPUCache", "ShaderCache", "GrShaderCache"
+)
+
+
+def copy_worker_profile(profile_dir, worker_id):
+    """
+    Refresh a worker's copy of profile_dir, so it starts with the profile's session.
+    Chrome locks a user-data directory, so workers cannot share it.
+    Returns:
+        The worker's profile directory (cold when profile_dir does not exist yet).
+    """
+    worker_dir = f"{profile_dir}_worker{worker_id}"
+    if os.path.isdir(profile_dir):
+        try:
+            shutil.rmtree(worker_dir, ignore_errors=True)
+            shutil.copytree(profile_dir, worker_dir, ignore=PROFILE_COPY_IGNORE)
+        except (OSError, shutil.Error) as e:
+            logging.warning(f"Worker {worker_id}: could not copy profile {profile_dir}: {e}")
+    return worker_dir
+
+
+def scrape_worker(worker_id, base_url, login_email, login_password, shard_urls, since=None,
+                  profile_dir=None, cookie_file=None, extraction="script"):
+    """
+    Process-pool entry point: one browser and one login, then each assigned shard in turn.
+    Each worker starts Chrome on a fresh copy of profile_dir (see copy_worker_profile).
+    Returns:
+        (records, stats) where stats carries the worker's session mode, startup time,
+        shard, item and throughput counts; truncated_shards counts shards whose scroll
+        hit its attempt limit before reaching the end of the shard or the high-water mark.
+    """
+    start_time = time.perf_counter()
+    stats = {
+        "worker": worker_id, "shards": len(shard_urls), "failed_shards": 0, "truncated_shards": 0,
+        "items": 0, "records": 0,
+    }
+    records = []
+    driver = initialize_browser(copy_worker_profile(profile_dir, worker_id) if profile_dir else None)
+    if not driver:
+        stats["failed_shards"] = len(shard_urls)
+    else:
+        try:
+            stats["session"] = open_feed(driver, base_url, login_email, login_password, cookie_file=cookie_file)
+            stats["startup_seconds"] = round(time.perf_counter() - start_time, 2)
+            for url in shard_urls:
+                try:
+                    shard_records, load_stats = scrape_feed(driver, since=since, url=url, extraction=extraction)
+                    records.extend(shard_records)
+                    stats["items"] += load_stats["items"]
+                    if load_stats.get("stop_reason") == "max_attempts":
+                        stats["truncated_shards"] += 1
+                except Exception as e:
+                    logging.error(f"Worker {worker_id}: shard {url} failed: {e}")
+                    stats["failed_shards"] += 1
+        except Exception as e:
+            logging.error(f"Worker {worker_id}: login failed: {e}")
+            stats["failed_shards"] = len(shard_urls)
+        finally:
+            driver.quit()
+    stats["records"] = len(records)
+    stats["seconds"] = round(time.perf_counter() - start_time, 2)
+    stats["records_per_second"] = round(stats["records"] / stats["seconds"], 2) if stats["seconds"] else 0.0
+    return records, stats
+
+
+def scrape_in_parallel(base_url, login_email, login_password, shard_urls, since=None, workers=4,
+                       profile_dir=None, cookie_file=None, extraction="script"):
+    """
+    Scrape feed shards with a pool of browser processes and merge the results.
+    Shards are dealt round-robin so every worker logs in exactly once.
+    Returns:
+        (records, worker_stats, failed_shards)
+    """
+    workers = max(1, min(workers, len(shard_urls)))
+    assignments = [shard_urls[i::workers] for i in range(workers)]
+    logging.info(f"Scraping {len(shard_urls)} shards with {workers} browser workers.")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(scrape_worker, worker_id, base_url, login_email, login_password, urls, since,
+                        profile_dir, cookie_file, extraction)
+            for worker_id, urls in enumerate(assignments, start=1)
+        ]
+        results = [future.result() for future in futures]
+
+    worker_stats = [stats for _, stats in results]
+    records, duplicates = merge_activity_records(records for records, _ in results)
+    for stats in worker_stats:
+        logging.info(
+            f"Worker {stats['worker']} ({stats.get('session', 'no')} session, "
+            f"{stats.get('startup_seconds', '-')}s to feed): {stats['shards']} shards ({stats['failed_shards']} failed), "
+            f"{stats['items']} feed items, {stats['records']} records in {stats['seconds']}s "
+            f"({stats['records_per_second']} records/s)."
+        )
+    logging.info(f"Merged {len(records)} records from all workers ({duplicates} cross-shard duplicates dropped).")
+    return records, worker_stats, sum(stats["failed_shards"] for stats in worker_stats)
+
+
 def populate_email_template(template, variables):
-    """Replace placeholders in the email template with actual values."""
+    """
+    Replace placeholders in the email template with actual values.
+    Each variable Key is written in the template as vKey, including the per-stage
+    vSetupSeconds, vScrollSeconds, vSaveToDbSeconds, ... and the vStageTimings table.
+    """
     for key, value in variables.items():
         template = template.replace(f"v{key}", str(value))
     return template
@@ -149,6 +791,8 @@ def send_summary_email(subject, body, recipient):
             os.system("start outlook")
             time.sleep(10)
 
+        import win32com.client  # Windows-only; imported lazily so the module loads elsewhere
+
         outlook = win32com.client.Dispatch("Outlook.Application")
         mail = outlook.CreateItem(0)
         mail.To = recipient
@@ -159,95 +803,230 @@ def send_summary_email(subject, body, recipient):
     except Exception as e:
         logging.error(f"Error sending email: {e}")
 
-def save_to_db(connection, data):
-    """Save extracted activities to MySQL database."""
-    try:
-        # query = """
-        #     INSERT INTO ExtractedActivities 
-        #     (Name, ActivityType, Date, Time, DateTimeStamp, TicketUrl, TimeSinceLastActivity)
-        #     VALUES (%s, %s, %s, %s, %s, %s, %s)
-        # """
-        query = """
-            INSERT INTO ExtractedActivities (Name, ActivityType, Date, Time, DateTimeStamp, TicketUrl, TimeSinceLastActivity)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-            TimeSinceLastActivity = VALUES(TimeSinceLastActivity);
-        """
+ACTIVITY_INSERT_COLUMNS = (
+    "Name", "ActivityType", "ActivityCategory", "Date", "Time", "DateTimeStamp", "TicketUrl"
+)
+# Re-scraped activities are already stored and immutable, so a duplicate key is a
+# no-op (0 affected rows) rather than a rewrite of the existing row.
+ACTIVITY_UPSERT_SUFFIX = """
+    ON DUPLICATE KEY UPDATE
+    Name = Name;
+"""
+
+
+def build_upsert_query(row_count):
+    """Build a multi-row INSERT ... ON DUPLICATE KEY UPDATE statement for row_count rows."""
+    placeholders = "(" + ", ".join(["%s"] * len(ACTIVITY_INSERT_COLUMNS)) + ")"
+    return (
+        f"INSERT INTO ExtractedActivities ({', '.join(ACTIVITY_INSERT_COLUMNS)}) VALUES "
+        + ", ".join([placeholders] * row_count)
+        + ACTIVITY_UPSERT_SUFFIX
+    )
+
+
+# Identity of an ExtractedActivities row (uq_activity_identity) as positions in ACTIVITY_INSERT_COLUMNS
+ACTIVITY_IDENTITY_COLUMNS = ("Name", "ActivityType", "DateTimeStamp", "TicketUrl")
+ACTIVITY_IDENTITY_POSITIONS = tuple(ACTIVITY_INSERT_COLUMNS.index(column) for column in ACTIVITY_IDENTITY_COLUMNS)
 
-        cursor = connection.cursor()
 
+def build_inserted_rows_query(row_count):
+    """
+    Build the SELECT for the rows a partly duplicate upsert of row_count rows inserted:
+    the chunk's identities whose id is at least LAST_INSERT_ID() (the first id the
+    upsert generated). Rows already stored before it have lower ids, and matching on
+    the identity keeps rows other sessions insert meanwhile out of the result.
+    """
+    identity = "(" + ", ".join(["%s"] * len(ACTIVITY_IDENTITY_COLUMNS)) + ")"
+    return (
+        f"SELECT {', '.join(ACTIVITY_INSERT_COLUMNS)} FROM ExtractedActivities "
+        f"WHERE id >= %s AND ({', '.join(ACTIVITY_IDENTITY_COLUMNS)}) IN ("
+        + ", ".join([identity] * row_count)
+        + ") ORDER BY id;"
+    )
+
+
+def write_chunk(connection, cursor, chunk, rejected):
+    """
+    Write one chunk of sanitized rows with a single multi-row upsert.
+    If the chunk fails it is split in half and each half retried, so a bad row
+    ends up isolated in `rejected` while the rest of the chunk is still written
+    in as few statements as possible.
+    Returns:
+        (rows written, rows actually inserted as tuples in ACTIVITY_INSERT_COLUMNS order).
+        Duplicates count as written but not inserted.
+    """
+    try:
+        params = [value for row in chunk for value in row]
+        cursor.execute(build_upsert_query(len(chunk)), params)
+        inserted = cursor.rowcount
+        if inserted == len(chunk):
+            inserted_rows = list(chunk)
+        elif inserted:
+            identities = [row[position] for row in chunk for position in ACTIVITY_IDENTITY_POSITIONS]
+            cursor.execute(build_inserted_rows_query(len(chunk)), [cursor.lastrowid] + identities)
+            inserted_rows = cursor.fetchall()
+            if len(inserted_rows) != inserted:
+                logging.warning(f"Upsert inserted {inserted} rows but {len(inserted_rows)} were read back; "
+                                f"summary counts may drift until --rebuild-summaries.")
+        else:
+            inserted_rows = []
+        connection.commit()
+        return len(chunk), inserted_rows
+    except mysql.connector.Error as e:
+        connection.rollback()
+        if len(chunk) == 1:
+            logging.error(f"Rejected row: {chunk[0]} - {e}")
+            rejected.append((chunk[0], str(e)))
+            return 0, []
+        middle = len(chunk) // 2
+        first_written, first_inserted = write_chunk(connection, cursor, chunk[:middle], rejected)
+        second_written, second_inserted = write_chunk(connection, cursor, chunk[middle:], rejected)
+        return first_written + second_written, first_inserted + second_inserted
+
+
+def save_to_db(connection, data, chunk_size=500):
+    """
+    Save extracted activities to MySQL database using chunked multi-row upserts.
+    Args:
+        connection: MySQL database connection object.
+        data: List of extracted activity dicts.
+        chunk_size: Rows per INSERT statement.
+    Returns:
+        dict with written, changed (newly inserted), skipped (already stored),
+        inserted (the newly inserted rows as dicts, for refresh_summaries),
+        rejected (list of (row, error)), seconds and rows_per_second.
+    """
+    stats = {
+        "written": 0, "changed": 0, "skipped": 0, "inserted": [], "rejected": [],
+        "seconds": 0.0, "rows_per_second": 0.0,
+    }
+    cursor = None
+    try:
+        start_time = time.perf_counter()
+        rows = []
         for row in data:
             try:
                 # Sanitize data to ensure compatibility with the database
                 sanitized_row = sanitize_data(row)
-                
-                #logging.info(f"Inserting row: {sanitized_row}")
-                cursor.execute(query, (
+                rows.append((
                     sanitized_row["Name"],
                     sanitized_row["ActivityType"],
+                    sanitized_row["ActivityCategory"],
                     sanitized_row["Date"],
                     sanitized_row["Time"],
                     sanitized_row["DateTimeStamp"],
-                    sanitized_row["TicketUrl"],
-                    sanitized_row["TimeSinceLast Activity"]
+                    sanitized_row["TicketUrl"]
                 ))
             except Exception as e:
-                # Log any error with the specific row
-                logging.error(f"Error inserting row: {row} - {e}")
+                logging.error(f"Rejected row during sanitizing: {row} - {e}")
+                stats["rejected"].append((row, str(e)))
 
-        connection.commit()
-        cursor.close()
-        logging.info("All valid data saved successfully to the database.")
+        cursor = connection.cursor()
+        for i in range(0, len(rows), chunk_size):
+            written, inserted = write_chunk(connection, cursor, rows[i:i + chunk_size], stats["rejected"])
+            stats["written"] += written
+            stats["inserted"].extend(dict(zip(ACTIVITY_INSERT_COLUMNS, row)) for row in inserted)
+        stats["changed"] = len(stats["inserted"])
+        stats["skipped"] = stats["written"] - stats["changed"]
+
+        stats["seconds"] = time.perf_counter() - start_time
+        if stats["seconds"]:
+            stats["rows_per_second"] = round(stats["written"] / stats["seconds"], 1)
+        logging.info(
+            f"Saved {stats['written']} rows in {stats['seconds']:.2f}s "
+            f"({stats['rows_per_second']} rows/s, chunk size {chunk_size}): "
+            f"{stats['changed']} changed, {stats['skipped']} unchanged duplicates skipped, "
+            f"{len(stats['rejected'])} rows rejected."
+        )
     except Exception as e:
         logging.error(f"Error saving data to database: {e}")
     finally:
         if cursor:
             cursor.close()
+    return stats
 # Check for NULL Values
 # The table schema specifies NOT NULL for several columns. Ensure no None or empty strings are being passed. Update the save_to_db function to handle this:
 
+DEFAULT_DATETIME = datetime(1900, 1, 1)
+DEFAULT_DATE = DEFAULT_DATETIME.date()
+
+
 def sanitize_data(row):
-    """Ensure data is properly sanitized and conforms to the database schema."""
-    def validate_date(date_str):
+    """
+    Ensure data is properly sanitized and conforms to the database schema.
+    Date and DateTimeStamp may be date/datetime values (as build_activity_records
+    produces, passed through untouched) or 'YYYY-MM-DD[ HH:MM:SS]' strings (parsed once).
+    """
+    def validate_date(value):
         try:
-            return datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m-%d")
-        except ValueError:
-            logging.warning(f"Invalid date format: {date_str}. Using default '1900-01-01'.")
-            return "1900-01-01"
+            return as_date(value)
+        except (TypeError, ValueError):
+            logging.warning(f"Invalid date format: {value}. Using default '1900-01-01'.")
+            return DEFAULT_DATE
 
-    def validate_datetime(datetime_str):
+    def validate_datetime(value):
         try:
-            return datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S").strftime("%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            logging.warning(f"Invalid datetime format: {datetime_str}. Using default '1900-01-01 00:00:00'.")
-            return "1900-01-01 00:00:00"
+            return as_datetime(value)
+        except (TypeError, ValueError):
+            logging.warning(f"Invalid datetime format: {value}. Using default '1900-01-01 00:00:00'.")
+            return DEFAULT_DATETIME
 
     return {
         "Name": row.get("Name", "Unknown")[:255],  # Limit VARCHAR size
         "ActivityType": row.get("ActivityType", "Unknown")[:255],  # Limit VARCHAR size
-        "Date": validate_date(row.get("Date", "1900-01-01")),
+        "ActivityCategory": row.get("ActivityCategory") or categorize_activity(row.get("ActivityType")),
+        "Date": validate_date(row.get("Date", DEFAULT_DATE)),
         "Time": row.get("Time", "00:00:00"),  # Ensure TIME format
-        "DateTimeStamp": validate_datetime(row.get("DateTimeStamp", "1900-01-01 00:00:00")),
-        "TicketUrl": row.get("TicketUrl", "")[:65535],  # TEXT limit
-        "TimeSinceLast Activity": row.get("TimeSinceLast Activity", "Unknown")[:255]  # Limit VARCHAR size
+        "DateTimeStamp": validate_datetime(row.get("DateTimeStamp", DEFAULT_DATETIME)),
+        "TicketUrl": row.get("TicketUrl", "")[:65535]  # TEXT limit
     }
 
 
 
 
-def filter_by_team(connection, valid_names, max_retries=3):
-    """Remove rows from ExtractedActivities that don't match valid names."""
-    query = "DELETE FROM ExtractedActivities WHERE Name NOT IN (%s);" % ','.join(['%s'] * len(valid_names))
+def filter_to_team(data, valid_names):
+    """
+    Keep only activities performed by TeamWiseSummary members, before they are written.
+    Args:
+        data: List of extracted activity dicts.
+        valid_names: Collection of valid names (from fetch_valid_names).
+    Returns:
+        (kept rows, number of rows dropped)
+    """
+    valid_names = set(valid_names)
+    kept = [row for row in data if row["Name"] in valid_names]
+    dropped = len(data) - len(kept)
+    dropped_names = {row["Name"] for row in data if row["Name"] not in valid_names}
+    logging.info(
+        f"Team filter kept {len(kept)} rows and dropped {dropped} rows "
+        f"from {len(dropped_names)} non-team names."
+    )
+    return kept, dropped
+
+
+def filter_by_team(connection, valid_names, max_retries=3, batch_size=5000):
+    """
+    Remove rows from ExtractedActivities that don't match valid names.
+    One-off cleanup for rows stored before the ingest-side team filter existed; deletes
+    in batches so each statement only holds its locks briefly.
+    """
+    query = ("DELETE FROM ExtractedActivities WHERE Name NOT IN (%s) LIMIT %d;"
+             % (','.join(['%s'] * len(valid_names)), batch_size))
     retries = 0
+    deleted = 0
 
     while retries < max_retries:
         try:
             cursor = connection.cursor()
-            cursor.execute(query, valid_names)
-            connection.commit()
+            while True:
+                cursor.execute(query, valid_names)
+                connection.commit()
+                deleted += cursor.rowcount
+                if cursor.rowcount < batch_size:
+                    break
             cursor.close()
-            logging.info("Filtered activities by team.")
-            return  # Exit after successful execution
+            logging.info(f"Filtered activities by team: {deleted} non-team rows deleted.")
+            return deleted  # Exit after successful execution
         except mysql.connector.Error as e:
             if e.errno == 1205:  # Lock wait timeout error code
                 retries += 1
@@ -261,22 +1040,42 @@ def filter_by_team(connection, valid_names, max_retries=3):
                 cursor.close()
 
     logging.error("Failed to filter activities after multiple retries.")
+    return deleted
 
 
 
-def update_date_summary(connection, max_retries=3):
-    """Update DateWiseSummary table with unique dates."""
-    query = """
-        INSERT INTO DateWiseSummary (Date)
-        SELECT DISTINCT Date FROM ExtractedActivities
-        ON DUPLICATE KEY UPDATE Date=VALUES(Date);
+def update_date_summary(connection, dates=None, max_retries=3):
+    """
+    Update DateWiseSummary table with unique dates.
+    Args:
+        connection: MySQL database connection object.
+        dates: Optional iterable of dates (or 'YYYY-MM-DD' strings) touched by this run. When
+            given only those dates are inserted; otherwise every distinct date in
+            ExtractedActivities is.
+        max_retries: Retries on lock wait timeout.
     """
+    if dates is None:
+        query = """
+            INSERT INTO DateWiseSummary (Date)
+            SELECT DISTINCT Date FROM ExtractedActivities
+            ON DUPLICATE KEY UPDATE Date=VALUES(Date);
+        """
+        params = None
+    else:
+        params = sorted(set(dates))
+        if not params:
+            return
+        query = f"""
+            INSERT INTO DateWiseSummary (Date)
+            VALUES {', '.join(['(%s)'] * len(params))}
+            ON DUPLICATE KEY UPDATE Date=VALUES(Date);
+        """
     retries = 0
 
     while retries < max_retries:
         try:
             cursor = connection.cursor()
-            cursor.execute(query)
+            cursor.execute(query, params)
             connection.commit()
             cursor.close()
             logging.info("Date-wise summary updated.")
@@ -294,6 +1093,77 @@ def update_date_summary(connection, max_retries=3):
                 cursor.close()
 
     logging.error("Failed to update date-wise summary after multiple retries.")
+def bump_data_version(connection):
+    """Advance the DataVersion token so report caches keyed on it are invalidated."""
+    try:
+        cursor = connection.cursor()
+        cursor.execute(DATA_VERSION_BUMP_SQL)
+        connection.commit()
+        cursor.close()
+        logging.info("Data version bumped.")
+    except Exception as e:
+        logging.error(f"Error bumping data version: {e}")
+def save_ingest_checkpoint(connection):
+    """Advance IngestCheckpoint to MAX(DateTimeStamp); call only once a run saved everything it scraped."""
+    try:
+        cursor = connection.cursor()
+        cursor.execute(INGEST_CHECKPOINT_SAVE_SQL)
+        connection.commit()
+        cursor.close()
+        logging.info("Ingest checkpoint advanced.")
+    except Exception as e:
+        logging.error(f"Error saving ingest checkpoint: {e}")
+
+
+def ingest_batches(connection, batches, valid_names, chunk_size=500, recorder=None):
+    """
+    Team-filter and save activity batches as they arrive, so an interrupted scrape
+    keeps every batch written before the failure.
+    Args:
+        connection: MySQL database connection object.
+        batches: Iterable of activity record lists (e.g. stream_activity_batches).
+        valid_names: Team member names; the team filter is skipped when empty.
+        chunk_size: Rows per multi-row INSERT in save_to_db.
+        recorder: Optional RunRecorder; timed as the 'filter_team' and 'save_to_db' stages.
+    Returns:
+        (saved_records, save_stats, dropped, complete) where save_stats sums the
+        per-batch save_to_db stats and complete is False if any row went unaccounted for.
+    """
+    saved = []
+    totals = {
+        "written": 0, "changed": 0, "skipped": 0, "inserted": [], "rejected": [],
+        "seconds": 0.0, "rows_per_second": 0.0,
+    }
+    dropped = 0
+    complete = True
+    if not valid_names:
+        logging.warning("No valid names found; skipping team filter.")
+    try:
+        for batch in batches:
+            if valid_names:
+                with timed_stage(recorder, "filter_team") as stage:
+                    batch, batch_dropped = filter_to_team(batch, valid_names)
+                    stage["rows"] = batch_dropped
+                dropped += batch_dropped
+            if not batch:
+                continue
+            with timed_stage(recorder, "save_to_db") as stage:
+                stats = save_to_db(connection, batch, chunk_size=chunk_size)
+                stage["rows"] = stats["written"]
+            if stats["written"] + len(stats["rejected"]) < len(batch):
+                complete = False
+            for key in ("written", "changed", "skipped", "seconds"):
+                totals[key] += stats[key]
+            totals["inserted"].extend(stats["inserted"])
+            totals["rejected"].extend(stats["rejected"])
+            saved.extend(batch)
+    except Exception as e:
+        logging.error(f"Scrape interrupted after saving {len(saved)} records: {e}")
+        complete = False
+    if totals["seconds"]:
+        totals["rows_per_second"] = round(totals["written"] / totals["seconds"], 1)
+    return saved, totals, dropped, complete
+
 #Code to Get Row Counts
 def get_table_row_count(connection, table_name):
     """Get the total row count from a specific database table."""
@@ -309,17 +1179,59 @@ def get_table_row_count(connection, table_name):
         return 0
 
 
+def backfill_activity_categories(connection):
+    """
+    Fill ActivityCategory for rows ingested before the column existed.
+    Each distinct raw ActivityType is categorized once in Python and the rows are
+    updated with one statement per category.
+    Returns:
+        Number of rows updated.
+    """
+    updated = 0
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT DISTINCT ActivityType FROM ExtractedActivities WHERE ActivityCategory IS NULL;")
+        by_category = {}
+        for (activity_type,) in cursor.fetchall():
+            by_category.setdefault(categorize_activity(activity_type), []).append(activity_type)
+
+        for category, activity_types in by_category.items():
+            cursor.execute(
+                f"""
+                UPDATE ExtractedActivities SET ActivityCategory = %s
+                WHERE ActivityCategory IS NULL
+                AND ActivityType IN ({', '.join(['%s'] * len(activity_types))});
+                """,
+                [category] + activity_types,
+            )
+            updated += cursor.rowcount
+            connection.commit()
+        logging.info(f"Backfilled ActivityCategory for {updated} rows across {len(by_category)} categories.")
+    except Exception as e:
+        logging.error(f"Error backfilling activity categories: {e}")
+    finally:
+        if cursor:
+            cursor.close()
+    return updated
+
+
 def update_activity_summary_counts(connection):
-    """Update the ActivitySummary table with counts from ExtractedActivities."""
+    """
+    Recount every ActivitySummary row from ExtractedActivities (full rebuild; runs use
+    apply_summary_deltas).
+    Args:
+        connection: MySQL database connection object.
+    """
     try:
         query = """
         UPDATE activitySummary AS a
         LEFT JOIN (
-            SELECT activitytype, COUNT(*) AS total
+            SELECT ActivityCategory, COUNT(*) AS total
             FROM extractedactivities
-            GROUP BY activitytype
+            GROUP BY ActivityCategory
         ) AS e
-        ON e.activitytype LIKE CONCAT('%', a.activitytype, '%')
+        ON e.ActivityCategory = a.activitytype
         SET a.count = COALESCE(e.total, 0);
         """
         cursor = connection.cursor()
@@ -330,30 +1242,52 @@ def update_activity_summary_counts(connection):
     except Exception as e:
         logging.error(f"Error updating ActivitySummary table: {e}")
 
-def update_total_count(connection, table_name):
+def build_summary_pivot_query(table_name, key_column):
     """
-    Updates the 'Total Count' column in the specified table by summing up relevant columns.
+    Build a single UPDATE ... JOIN that recomputes every activity counter and
+    `Total Count` in a summary table from one GROUP BY pass over extractedactivities.
+    Args:
+        table_name: Summary table to update ('teamwisesummary' or 'datewisesummary').
+        key_column: Column shared by the summary table and extractedactivities ('Name' or 'Date').
+    """
+    counters = ",\n            ".join(
+        f"SUM(e.ActivityCategory = '{column}') AS `{column}`" for column in ACTIVITY_COLUMNS
+    )
+    assignments = ",\n        ".join(
+        f"s.`{column}` = COALESCE(p.`{column}`, 0)" for column in ACTIVITY_COLUMNS
+    )
+    total = " + ".join(f"COALESCE(p.`{column}`, 0)" for column in ACTIVITY_COLUMNS)
+    return f"""
+    UPDATE {table_name} AS s
+    LEFT JOIN (
+        SELECT e.{key_column} AS summary_key,
+            {counters}
+        FROM extractedactivities AS e
+        GROUP BY e.{key_column}
+    ) AS p ON p.summary_key = s.{key_column}
+    SET {assignments},
+        s.`Total Count` = {total};
+    """
+
+
+def update_summary_table(connection, table_name, key_column):
+    """
+    Recompute all activity counters and `Total Count` of a summary table in one statement
+    (full rebuild; runs use apply_summary_deltas).
     Args:
         connection: MySQL database connection object.
-        table_name: Name of the table to update ('teamwisesummary' or 'datewisesummary').
+        table_name: Summary table to update.
+        key_column: Column the summary table is keyed on ('Name' or 'Date').
     """
     try:
-        query = f"""
-        UPDATE {table_name}
-        SET `Total Count` = 
-            `Ticket Received` + `Forwarded ticket` + `Created Ticket` + `Viewed ticket` +
-            `Assigned to` + `Changed status` + `Added a note` + `Added a tag` +
-            `Followed ticket` + `Moved from` + `Wrote a reply` + `Merged to` +
-            `Unassigned ticket` + `Customer` + `Unfollowed ticket` +
-            `Deleted message` + `Edited a note` + `Changed priority`;
-        """
         cursor = connection.cursor()
-        cursor.execute(query)
+        cursor.execute(build_summary_pivot_query(table_name, key_column))
         connection.commit()
         cursor.close()
-        logging.info(f"Total Count column updated successfully in {table_name}.")
+        logging.info(f"{table_name} counters and Total Count updated successfully.")
     except Exception as e:
-        logging.error(f"Error updating Total Count in {table_name}: {e}")
+        logging.error(f"Error updating {table_name}: {e}")
+
 #Function to Update TeamWiseSummary Columns
 def update_teamwise_summary(connection):
     """
@@ -362,36 +1296,7 @@ def update_teamwise_summary(connection):
     Args:
         connection: MySQL database connection object.
     """
-    try:
-        # List of columns to update
-        columns = [
-            "Ticket Received", "Forwarded ticket", "Created Ticket", "Viewed ticket", "Assigned to",
-            "Changed status", "Added a note", "Added a tag", "Followed ticket", "Moved from",
-            "Wrote a reply", "Merged to", "Unassigned ticket", "Customer", "Unfollowed ticket",
-            "Deleted message", "Edited a note", "Changed priority"
-        ]
-
-        # Generate dynamic SQL for each column
-        updates = ", ".join([
-            f"`{column}` = (SELECT COUNT(*) FROM extractedactivities AS e WHERE e.activitytype LIKE '%{column}%' AND e.Name = t.Name)"
-            for column in columns
-        ])
-
-        # Complete SQL query
-        query = f"""
-        UPDATE teamwisesummary AS t
-        SET {updates};
-        """
-
-        # Execute the query
-        cursor = connection.cursor()
-        cursor.execute(query)
-        connection.commit()
-        cursor.close()
-
-        logging.info("TeamWiseSummary table updated successfully.")
-    except Exception as e:
-        logging.error(f"Error updating TeamWiseSummary table: {e}")
+    update_summary_table(connection, "teamwisesummary", "Name")
 
 #Function to Update DateWiseSummary Columns
 def update_datewise_summary(connection):
@@ -401,50 +1306,194 @@ def update_datewise_summary(connection):
     Args:
         connection: MySQL database connection object.
     """
-    try:
-        # List of columns to update
-        columns = [
-            "Ticket Received", "Forwarded ticket", "Created Ticket", "Viewed ticket", "Assigned to",
-            "Changed status", "Added a note", "Added a tag", "Followed ticket", "Moved from",
-            "Wrote a reply", "Merged to", "Unassigned ticket", "Customer", "Unfollowed ticket",
-            "Deleted message", "Edited a note", "Changed priority"
-        ]
+    update_summary_table(connection, "datewisesummary", "Date")
 
-        # Generate dynamic SQL for each column
-        updates = ", ".join([
-            f"`{column}` = (SELECT COUNT(*) FROM extractedactivities AS e WHERE e.activitytype LIKE '%{column}%' AND e.Date = d.Date)"
-            for column in columns
-        ])
 
-        # Complete SQL query
-        query = f"""
-        UPDATE datewisesummary AS d
-        SET {updates};
-        """
+def build_summary_delta_query(table_name, key_column):
+    """Build an UPDATE that adds one delta per activity counter, plus their sum to `Total Count`, to one summary row."""
+    assignments = ",\n        ".join(f"`{column}` = `{column}` + %s" for column in ACTIVITY_COLUMNS)
+    return f"""
+    UPDATE {table_name}
+    SET {assignments},
+        `Total Count` = `Total Count` + %s
+    WHERE {key_column} = %s;
+    """
 
-        # Execute the query
+
+def apply_summary_deltas(connection, rows, sign=1):
+    """
+    Add the counts of newly inserted activities to TeamWiseSummary, DateWiseSummary and
+    ActivitySummary. Rows are grouped by (Name, Date, ActivityCategory) and each summary row
+    is updated once with the sum of its groups, so the cost follows the batch, not the
+    history. All three tables change in one transaction.
+    Args:
+        connection: MySQL database connection object.
+        rows: Activity dicts actually inserted (save_to_db's stats["inserted"]).
+        sign: -1 to subtract the counts of rows that were just deleted instead.
+    Returns:
+        True if the deltas were applied.
+    """
+    groups = Counter((row["Name"], as_date(row["Date"]), row["ActivityCategory"]) for row in rows)
+    by_name, by_date, by_category = defaultdict(Counter), defaultdict(Counter), Counter()
+    for (name, day, category), count in groups.items():
+        by_name[name][category] += sign * count
+        by_date[day][category] += sign * count
+        by_category[category] += sign * count
+
+    def delta_params(summaries):
+        params = []
+        for key, counts in summaries.items():
+            deltas = [counts[column] for column in ACTIVITY_COLUMNS]
+            params.append((*deltas, sum(deltas), key))
+        return params
+
+    cursor = None
+    try:
         cursor = connection.cursor()
-        cursor.execute(query)
+        cursor.executemany(build_summary_delta_query("teamwisesummary", "Name"), delta_params(by_name))
+        cursor.executemany(build_summary_delta_query("datewisesummary", "Date"), delta_params(by_date))
+        cursor.executemany(
+            "UPDATE activitySummary SET count = count + %s WHERE activitytype = %s;",
+            [(count, category) for category, count in by_category.items()],
+        )
         connection.commit()
-        cursor.close()
+        logging.info(
+            f"Summary counters adjusted from {len(rows)} rows in {len(groups)} (Name, Date, ActivityCategory) "
+            f"groups: {len(by_name)} names, {len(by_date)} dates, {len(by_category)} categories."
+        )
+        return True
+    except Exception as e:
+        connection.rollback()
+        logging.error(f"Error applying summary deltas (run with --rebuild-summaries to recount): {e}")
+        return False
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def activity_hour(datetime_stamp):
+    """Start of the hour of a DateTimeStamp (datetime, or 'YYYY-MM-DD HH:MM:SS' string kept as a string)."""
+    if isinstance(datetime_stamp, datetime):
+        return datetime_stamp.replace(minute=0, second=0, microsecond=0)
+    return f"{datetime_stamp[:13]}:00:00"
+
 
-        logging.info("DateWiseSummary table updated successfully.")
+def update_hourly_rollup(connection, hours=None, batch_size=200):
+    """
+    Recompute ActivityHourly, the (hour, Name, ActivityCategory) rollup the report reads.
+    Each touched hour is deleted and re-counted from ExtractedActivities, so rerunning
+    it (or ingesting duplicates) never double counts.
+    Args:
+        connection: MySQL database connection object.
+        hours: Optional iterable of hour starts (see activity_hour) touched by this run;
+            the whole rollup is rebuilt when None.
+        batch_size: Hours recomputed per transaction.
+    """
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        if hours is None:
+            cursor.execute("DELETE FROM ActivityHourly;")
+            cursor.execute(hourly_rollup_sql())
+            connection.commit()
+            logging.info(f"ActivityHourly rebuilt with {cursor.rowcount} rows.")
+            return
+
+        hours = sorted(set(hours))
+        for i in range(0, len(hours), batch_size):
+            batch = hours[i:i + batch_size]
+            cursor.execute(
+                f"DELETE FROM ActivityHourly WHERE ActivityHour IN ({', '.join(['%s'] * len(batch))});",
+                batch,
+            )
+            ranges = " OR ".join(["(DateTimeStamp >= %s AND DateTimeStamp < %s + INTERVAL 1 HOUR)"] * len(batch))
+            cursor.execute(hourly_rollup_sql(ranges), [hour for hour in batch for _ in range(2)])
+            connection.commit()
+        logging.info(f"ActivityHourly updated for {len(hours)} touched hours.")
     except Exception as e:
-        logging.error(f"Error updating DateWiseSummary table: {e}")
+        connection.rollback()
+        logging.error(f"Error updating ActivityHourly: {e}")
+    finally:
+        if cursor:
+            cursor.close()
 
 
-def main():
-    """Main execution flow."""
+def refresh_summaries(connection, data=None, removed=False):
+    """
+    Bring DateWiseSummary (dates and counters), ActivitySummary, TeamWiseSummary and the
+    ActivityHourly rollup up to date.
+    Args:
+        connection: MySQL database connection object.
+        data: Activity rows inserted by this run (save_to_db's stats["inserted"], so skipped
+            duplicates are not counted again). Their counts are added to the summary rows and
+            the hours they touch are re-rolled; pass None to rebuild every summary row.
+            Deltas assume this run is the only one adding counts for these rows: if another
+            ingest inserts the same activity between this run's upsert and its read-back, the
+            activity can be counted twice until the next --rebuild-summaries.
+        removed: data holds rows just deleted from ExtractedActivities; their counts are subtracted.
+    """
+    start_time = time.perf_counter()
+    if data is None:
+        logging.info("Rebuilding all summary tables from ExtractedActivities.")
+        update_date_summary(connection)
+        update_activity_summary_counts(connection)
+        update_teamwise_summary(connection)
+        update_datewise_summary(connection)
+        update_hourly_rollup(connection)
+    elif data:
+        hours = {activity_hour(row["DateTimeStamp"]) for row in data}
+        logging.info(f"Refreshing summaries from {len(data)} {'removed' if removed else 'inserted'} rows.")
+        if not removed:
+            update_date_summary(connection, dates={row["Date"] for row in data})
+        apply_summary_deltas(connection, data, sign=-1 if removed else 1)
+        update_hourly_rollup(connection, hours=hours)
+    logging.info(f"Summary refresh finished in {time.perf_counter() - start_time:.2f}s.")
+
+
+def main(full_rescan=False, chunk_size=500, rebuild_summaries=False, workers=1, shard_url=None, shard_days=7,
+         batch_scrolls=20, profile_dir=None, cookie_file=None, extraction="script", rescan_from=None):
+    """
+    Main execution flow.
+    Args:
+        full_rescan: Scroll the whole feed and re-extract every item (backfill mode)
+            instead of stopping at the latest DateTimeStamp already in the database.
+        chunk_size: Rows per multi-row INSERT in save_to_db.
+        rebuild_summaries: Recompute every summary row from the full history instead
+            of only the rows touched by this run.
+        workers: Browser processes for parallel ingest; 1 scrapes the feed serially.
+        shard_url: Feed URL template used to split the feed between workers
+            (see build_shard_urls); required when workers > 1.
+        shard_days: Days covered by date shards when there is no high-water mark.
+        batch_scrolls: Scrolls per streamed batch (serial mode); each batch is saved
+            and its DOM nodes dropped before scrolling on.
+        profile_dir: Persistent Chrome user-data directory to reuse the portal session.
+        cookie_file: JSON file to restore session cookies from and save them to after login.
+        extraction: How feed items are read, 'script' or 'html' (see collect_feed_items).
+        rescan_from: First day (a date) a parallel full rescan covers with date shards;
+            required for that combination, as the feed has no other start date.
+    """
     script_start_time = datetime.now()
+    if full_rescan and workers > 1 and shard_url and is_date_shard_template(shard_url) and rescan_from is None:
+        # Defaulting to the last shard_days days would cover a fraction of the feed
+        # and still advance the ingest checkpoint as if the rescan were complete.
+        logging.error("A parallel --full-rescan with a {start}/{end} shard URL needs --rescan-from; aborting run.")
+        return
 
     connection = get_db_connection()
     if not connection:
         return
+    recorder = RunRecorder("scrape", connection)
 
-    config_details = get_config_details_from_db(connection)
+    with recorder.stage("setup"):
+        config_details = get_config_details_from_db(connection)
+        schema_version = apply_migrations(connection) if config_details else None
     if not config_details:
         connection.close()
         return
+    if schema_version is None:
+        logging.error("Schema is not up to date; aborting run.")
+        connection.close()
+        return
 # Generate the dynamic subject
     current_time = datetime.now().strftime("%d-%b-%Y %H:%M:%S")  # Format: "26-Nov-2024 19:32:26"
     email_subject = f"Activity Report Summary as of {current_time}"  # Generate subject dynamically
@@ -456,43 +1505,98 @@ def main():
     login_email = config_details["login_email"]
     login_password = config_details["login_password"]
 
-    driver = initialize_browser()
-    if not driver:
-        connection.close()
-        return
-
+    with recorder.stage("setup"):
+        high_water_mark = None
+        if full_rescan:
+            logging.info("Full rescan requested; ignoring high-water mark.")
+        else:
+            high_water_mark = fetch_high_water_mark(connection)
+        valid_names = fetch_valid_names(connection)
+
+    if workers > 1 and not shard_url:
+        logging.warning("Parallel ingest needs --shard-url to split the feed; scraping with one browser.")
+        workers = 1
+
+    driver = None
+    worker_stats = []
+    scrape_stats = {}
+    session_mode = "parallel"
+    run_status = "failed"
     try:
-        driver.get(base_url)
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "loginemail"))).send_keys(login_email)
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "loginpassword"))).send_keys(login_password)
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "loginpassword"))).send_keys(Keys.RETURN)
-
-        WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.CLASS_NAME, "user-info__user-name")))
-
-        trigger_load_more(driver, max_attempts=1000, pause_time=1)
-        table_data = extract_activity_data(driver)
+        # Get existing row count before insertion
+        existing_row_count = get_table_row_count(connection, "ExtractedActivities")
+        logging.info(f"Existing row count in ExtractedActivities: {existing_row_count}")
+        if workers > 1:
+            shard_urls = build_shard_urls(
+                shard_url, since=high_water_mark, agents=valid_names, shard_days=shard_days,
+                start=rescan_from if full_rescan else None,
+            )
+            if not shard_urls:
+                logging.error("Shard URL template produced no shards; aborting run.")
+                return
+            with recorder.stage("parallel_scrape") as stage:
+                merged_data, worker_stats, failed_shards = scrape_in_parallel(
+                    base_url, login_email, login_password, shard_urls, since=high_water_mark, workers=workers,
+                    profile_dir=profile_dir, cookie_file=cookie_file, extraction=extraction
+                )
+                stage["rows"] = len(merged_data)
+            if failed_shards:
+                # Saving a partial scrape would move the high-water mark past the missing shards
+                logging.error(f"{failed_shards} shards failed; nothing saved, rerun to retry.")
+                return
+            batches = [merged_data]
+        else:
+            with recorder.stage("startup"):
+                driver = initialize_browser(profile_dir)
+                if not driver:
+                    return
+                session_mode = open_feed(driver, base_url, login_email, login_password, cookie_file=cookie_file)
+            logging.info(f"Startup to first feed item: {recorder.stages['startup']['seconds']:.2f}s ({session_mode} session).")
+            # Records are harvested and saved batch by batch while the feed scrolls
+            batches = stream_activity_batches(
+                driver, since=high_water_mark, batch_scrolls=batch_scrolls, stats=scrape_stats, recorder=recorder,
+                extraction=extraction,
+            )
+
+        # Drop activities from non-team members before they reach the database, then save
+        table_data, save_stats, dropped_row_count, complete = ingest_batches(
+            connection, batches, valid_names, chunk_size=chunk_size, recorder=recorder
+        )
+        # Saving every scraped row is not enough: a scroll that gave up before the
+        # high-water mark leaves a gap behind it, which the next run must rescan.
+        if workers > 1:
+            truncated_shards = sum(stats["truncated_shards"] for stats in worker_stats)
+            if truncated_shards:
+                logging.warning(f"{truncated_shards} shards stopped scrolling at the attempt limit; "
+                                f"activities after {high_water_mark} may be missing.")
+                complete = False
+        elif high_water_mark is not None and scrape_stats.get("stop_reason") != "high_water_mark":
+            logging.warning(f"Scroll stopped ({scrape_stats.get('stop_reason', 'interrupted')}) before reaching the "
+                            f"high-water mark {high_water_mark}; older activities after it may be missing.")
+            complete = False
 
         if table_data:
             #logging.info(f"Extracted data: {table_data}")
             logging.info(f"Ticket data is extracted successfully!")
-            # Get existing row count before insertion
-            existing_row_count = get_table_row_count(connection, "ExtractedActivities")
-            logging.info(f"Existing row count in ExtractedActivities: {existing_row_count}")
-            # Save the extracted data to the database
-            save_to_db(connection, table_data)
-            # Get latest row count after insertion
-            latest_row_count = get_table_row_count(connection, "ExtractedActivities")
-            logging.info(f"Latest row count in ExtractedActivities: {latest_row_count}")
-
-            valid_names = fetch_valid_names(connection)
-            filter_by_team(connection, valid_names)
             # Get latest row count after insertion
             latest_row_count = get_table_row_count(connection, "ExtractedActivities")
             logging.info(f"Latest row count in ExtractedActivities: {latest_row_count}")
                 # Calculate the number of rows inserted
             rows_inserted = latest_row_count - existing_row_count
             logging.info(f"Rows inserted: {rows_inserted}")
-            update_date_summary(connection)
+
+            # Mirror the new rows into the local analytics cache before the viewer is told about them
+            cache_dir = analytics_cache_dir()
+            if cache_dir and save_stats["changed"]:
+                with recorder.stage("analytics_cache") as stage:
+                    stage["rows"] = sync_analytics_cache(connection, cache_dir)
+
+            # Update DateWiseSummary, ActivitySummary, TeamWiseSummary and the ActivityHourly rollup
+            with recorder.stage("summaries"):
+                refresh_summaries(connection, None if rebuild_summaries else save_stats["inserted"])
+                if save_stats["changed"] or rebuild_summaries:
+                    bump_data_version(connection)
+
             # Get the directory of the current script or executable
             script_dir = os.path.dirname(os.path.abspath(__file__))  # Get script directory
             #file_size = humanize.naturalsize(os.path.getsize(file_path))
@@ -505,31 +1609,176 @@ def main():
                 "TotalExecutionTime": str(datetime.now() - script_start_time),
                 "ExistingCount": existing_row_count,
                 "LatestCount": latest_row_count,
-                "TotalCount": rows_inserted
+                "TotalCount": rows_inserted,
+                "RowsPerSecond": save_stats["rows_per_second"],
+                "ChangedCount": save_stats["changed"],
+                "SkippedCount": save_stats["skipped"],
+                "DroppedCount": dropped_row_count,
+                "RejectedCount": len(save_stats["rejected"]),
+                "WorkerCount": len(worker_stats) or 1,
+                "BatchCount": scrape_stats.get("batches", 1),
+                "PeakBrowserRSS": humanize.naturalsize(scrape_stats.get("peak_browser_rss", 0)),
+                "SessionMode": session_mode
             }
-                # Update activity summary counts
-            update_activity_summary_counts(connection)
-            
-            # Update TeamWiseSummary table
-            update_teamwise_summary(connection)
-
-            # Update DateWiseSummary table
-            update_datewise_summary(connection)
-            # Update Total Count columns
-            update_total_count(connection, "teamwisesummary")
-            update_total_count(connection, "datewisesummary")
-            
-            populated_email_body = populate_email_template(email_body, variables)
-            send_summary_email(email_subject, populated_email_body, email_recipient)
+            # Per-stage seconds (e.g. vScrollSeconds, vSaveToDbSeconds) and the vStageTimings table
+            variables.update(recorder.email_variables())
+
+            with recorder.stage("email"):
+                populated_email_body = populate_email_template(email_body, variables)
+                send_summary_email(email_subject, populated_email_body, email_recipient)
         else:
             logging.warning("No data extracted.")
+            if rebuild_summaries:
+                with recorder.stage("summaries"):
+                    refresh_summaries(connection)
+                    bump_data_version(connection)
+
+        if complete:
+            save_ingest_checkpoint(connection)
+            run_status = "ok"
+        else:
+            logging.warning("Run did not finish cleanly; the ingest checkpoint is unchanged so the next run rescans from it.")
+            run_status = "incomplete"
 
     finally:
         if driver:
             driver.quit()
         if connection:
+            recorder.save(run_status)
             connection.close()
 
 
+def run_maintenance(cleanup_non_team=False, backfill_categories=False):
+    """
+    One-off maintenance commands that run without scraping, followed by a full summary rebuild.
+    Args:
+        cleanup_non_team: Delete stored activities of names not in TeamWiseSummary.
+        backfill_categories: Fill ActivityCategory for rows ingested before it existed.
+    The analytics cache, when configured, is rebuilt as well.
+    """
+    connection = get_db_connection()
+    if not connection:
+        return
+    recorder = None
+    try:
+        if apply_migrations(connection) is None:
+            logging.error("Schema is not up to date; skipping maintenance.")
+            return
+        recorder = RunRecorder("maintenance", connection)
+        if cleanup_non_team:
+            valid_names = fetch_valid_names(connection)
+            if valid_names:
+                with recorder.stage("filter_by_team") as stage:
+                    stage["rows"] = filter_by_team(connection, valid_names)
+            else:
+                logging.error("No valid names found; refusing to delete activities.")
+        if backfill_categories:
+            with recorder.stage("backfill_categories") as stage:
+                stage["rows"] = backfill_activity_categories(connection)
+        cache_dir = analytics_cache_dir()
+        if cache_dir:
+            # Deleted or updated rows cannot be appended; re-export the whole table
+            with recorder.stage("analytics_cache") as stage:
+                stage["rows"] = sync_analytics_cache(connection, cache_dir, rebuild=True)
+        with recorder.stage("summaries"):
+            refresh_summaries(connection)
+            bump_data_version(connection)
+        recorder.save("ok")
+    finally:
+        connection.close()
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape desk ticket activities into TicketActivityDB.")
+    parser.add_argument(
+        "--full-rescan",
+        action="store_true",
+        help="Scroll the entire feed and re-extract all activities (backfill) instead of stopping at the high-water mark.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=500,
+        help="Rows per multi-row INSERT when saving activities (default: 500).",
+    )
+    parser.add_argument(
+        "--rebuild-summaries",
+        action="store_true",
+        help="Recompute every summary table row from the full history instead of only the rows touched by this run.",
+    )
+    parser.add_argument(
+        "--cleanup-non-team",
+        action="store_true",
+        help="Delete stored activities of names not in TeamWiseSummary, rebuild the summaries and exit.",
+    )
+    parser.add_argument(
+        "--backfill-categories",
+        action="store_true",
+        help="Fill ActivityCategory for existing rows, rebuild the summaries and exit without scraping.",
+    )
+    parser.add_argument(
+        "--rebuild-analytics-cache",
+        action="store_true",
+        help="Re-export ExtractedActivities into the analytics cache, rebuild the summaries and exit without scraping.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Browser processes for parallel ingest (default: 1, serial). Needs --shard-url.",
+    )
+    parser.add_argument(
+        "--shard-url",
+        help="Feed URL template splitting the feed between workers: {agent} for one shard per team member, "
+             "or {start}/{end} (YYYY-MM-DD) for one shard per day.",
+    )
+    parser.add_argument(
+        "--shard-days",
+        type=int,
+        default=7,
+        help="Days covered by date shards when there is no high-water mark (default: 7).",
+    )
+    parser.add_argument(
+        "--batch-scrolls",
+        type=int,
+        default=20,
+        help="Scrolls per streamed batch; each batch is saved and removed from the page (default: 20).",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        help="Persistent Chrome user-data directory; reuses the portal session instead of logging in every run. "
+             "Parallel workers each start from a copy of it.",
+    )
+    parser.add_argument(
+        "--cookie-file",
+        help="JSON file of portal session cookies, restored at startup and rewritten after each login.",
+    )
+    parser.add_argument(
+        "--extraction",
+        choices=EXTRACTION_STRATEGIES,
+        default="script",
+        help="Read feed items with in-browser JavaScript ('script') or by parsing the page source "
+             "with lxml ('html') (default: script).",
+    )
+    parser.add_argument(
+        "--rescan-from",
+        type=date.fromisoformat,
+        help="First day (YYYY-MM-DD) covered by a parallel --full-rescan; required with a {start}/{end} --shard-url.",
+    )
+    args = parser.parse_args()
+    if args.cleanup_non_team or args.backfill_categories or args.rebuild_analytics_cache:
+        run_maintenance(cleanup_non_team=args.cleanup_non_team, backfill_categories=args.backfill_categories)
+    else:
+        main(
+            full_rescan=args.full_rescan,
+            chunk_size=args.chunk_size,
+            rebuild_summaries=args.rebuild_summaries,
+            workers=args.workers,
+            shard_url=args.shard_url,
+            shard_days=args.shard_days,
+            batch_scrolls=args.batch_scrolls,
+            profile_dir=args.profile_dir,
+            cookie_file=args.cookie_file,
+            extraction=args.extraction,
+            rescan_from=args.rescan_from,
+        )
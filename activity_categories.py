@@ -0,0 +1,34 @@
+"""Canonical activity categories for desk activity feed events.
+
+The feed reports free-text event titles such as "Assigned to Jane Doe" or
+"Unfollowed ticket". Every title is mapped once, at ingest, to one of the 18
+categories below and stored in ExtractedActivities.ActivityCategory so that
+summaries and reports can group by equality instead of LIKE '%...%'.
+"""
+from functools import lru_cache
+
+# The 18 activity categories tracked by activitySummary, TeamWiseSummary and DateWiseSummary
+ACTIVITY_CATEGORIES = [
+    "Ticket Received", "Forwarded ticket", "Created Ticket", "Viewed ticket", "Assigned to",
+    "Changed status", "Added a note", "Added a tag", "Followed ticket", "Moved from",
+    "Wrote a reply", "Merged to", "Unassigned ticket", "Customer", "Unfollowed ticket",
+    "Deleted message", "Edited a note", "Changed priority"
+]
+
+# Category stored for event titles that match none of the known categories
+OTHER_CATEGORY = "Other"
+
+# Longest first, so "Unfollowed ticket" wins over "Followed ticket"
+_MATCH_ORDER = sorted(ACTIVITY_CATEGORIES, key=len, reverse=True)
+
+
+@lru_cache(maxsize=1024)
+def categorize_activity(activity_type):
+    """Map a raw feed ActivityType string to its canonical category (case-insensitive)."""
+    if not activity_type:
+        return OTHER_CATEGORY
+    lowered = activity_type.lower()
+    for category in _MATCH_ORDER:
+        if category.lower() in lowered:
+            return category
+    return OTHER_CATEGORY
@@ -0,0 +1,134 @@
+"""
+Indexed search over the activity and summary tables.
+
+Tables listed in schema_migrations.SEARCH_INDEXES are searched with
+MATCH ... AGAINST on their FULLTEXT index and ranked by relevance. Date-shaped
+input ('2024-11-26' or '2024-11') becomes a range on the table's indexed date
+column instead. Words the FULLTEXT parser does not index (shorter than
+MIN_TOKEN_SIZE, stopwords) are left out rather than forcing a scan, so a
+search never reads the whole of a large table. Tables without an index
+(DateWiseSummary holds only a date and counters) use the CONCAT_WS(...) LIKE
+scan over every column, which is only acceptable on small tables.
+"""
+import re
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import text
+
+from schema_migrations import SEARCH_INDEXES
+
+# InnoDB's default innodb_ft_min_token_size; shorter words are not indexed
+MIN_TOKEN_SIZE = 3
+
+# InnoDB's default FULLTEXT stopword list; these words are never indexed
+INNODB_STOPWORDS = {
+    "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for", "from", "how",
+    "i", "in", "is", "it", "la", "of", "on", "or", "that", "the", "this", "to", "was", "what",
+    "when", "where", "who", "will", "with", "und", "www",
+}
+
+# Indexed date column searched by range for date-shaped input
+SEARCH_DATE_COLUMNS = {"extractedactivities": "DateTimeStamp"}
+
+DATE_TOKEN_PATTERN = re.compile(r"(\d{4})-(\d{1,2})(?:-(\d{1,2}))?")
+
+
+def fulltext_terms(search_query):
+    """
+    Turn free text into a boolean-mode query requiring every indexed word as a prefix
+    ("assigned to jan" -> "+assigned* +jan*"). Returns None when no word is indexed.
+    """
+    words = [
+        word for word in re.findall(r"\w+", search_query.lower())
+        if len(word) >= MIN_TOKEN_SIZE and word not in INNODB_STOPWORDS
+    ]
+    return " ".join(f"+{word}*" for word in words) or None
+
+
+def date_range(token):
+    """The [start, end) dates of a 'YYYY-MM-DD' or 'YYYY-MM' token, or None if it is not a date."""
+    match = DATE_TOKEN_PATTERN.fullmatch(token)
+    if not match:
+        return None
+    year, month, day = (int(part) if part else None for part in match.groups())
+    try:
+        if day is not None:
+            start = date(year, month, day)
+            return start, date.fromordinal(start.toordinal() + 1)
+        start = date(year, month, 1)
+        return start, date(year + month // 12, month % 12 + 1, 1)
+    except ValueError:
+        return None
+
+
+def search_help(table_name):
+    """Describe what the search box matches for a table, for the UI help text."""
+    table_name = table_name.lower()
+    index = SEARCH_INDEXES.get(table_name)
+    if not index:
+        return "Matches the text anywhere in any column."
+    help_text = (f"Matches words of {MIN_TOKEN_SIZE}+ characters (or their beginnings) in "
+                 f"{', '.join(index[1])}; shorter words are ignored.")
+    if table_name in SEARCH_DATE_COLUMNS:
+        help_text += f" Dates as YYYY-MM-DD or YYYY-MM filter on {SEARCH_DATE_COLUMNS[table_name]}."
+    return help_text
+
+
+def build_search(table_name, search_query, column_names):
+    """
+    Build the search predicate for a table.
+    Args:
+        table_name: Lower-case table name.
+        search_query: Free-text search entered by the user.
+        column_names: All columns of the table (used by the LIKE fallback).
+    Returns:
+        (condition, params, rank expression or None)
+    """
+    index = SEARCH_INDEXES.get(table_name)
+    if index:
+        conditions, params, words = [], {}, []
+        date_column = SEARCH_DATE_COLUMNS.get(table_name)
+        for token in search_query.split():
+            dates = date_range(token)
+            if dates is None:
+                words.append(token)
+            elif date_column is None:
+                # The table holds no dates, so nothing can match
+                conditions.append("1 = 0")
+            else:
+                n = len(params) // 2
+                conditions.append(f"{date_column} >= :date_start_{n} AND {date_column} < :date_end_{n}")
+                params.update({f"date_start_{n}": dates[0], f"date_end_{n}": dates[1]})
+        terms = fulltext_terms(" ".join(words))
+        rank = None
+        if terms:
+            rank = f"MATCH({', '.join(index[1])}) AGAINST(:search_terms IN BOOLEAN MODE)"
+            conditions.append(rank)
+            params["search_terms"] = terms
+        # Only unindexed words were entered: match nothing rather than scan
+        return " AND ".join(conditions) or "1 = 0", params, rank
+    condition = f"CONCAT_WS(' ', {', '.join(f'`{column}`' for column in column_names)}) LIKE :search_query"
+    return condition, {"search_query": f"%{search_query}%"}, None
+
+
+def search_rows(connection, table_name, search_query, column_names, limit=10, offset=0):
+    """Return one page of matching rows as a DataFrame, best matches first."""
+    condition, params, rank = build_search(table_name, search_query, column_names)
+    order_by = []
+    if rank:
+        order_by.append(f"{rank} DESC")
+    if "id" in column_names:
+        order_by.append("id DESC")
+    query = f"SELECT * FROM {table_name} WHERE {condition}"
+    if order_by:
+        query += f" ORDER BY {', '.join(order_by)}"
+    query += f" LIMIT {int(limit)} OFFSET {int(offset)};"
+    return pd.read_sql(text(query), connection, params=params)
+
+
+def count_matches(connection, table_name, search_query, column_names):
+    """Return the number of rows matching the search."""
+    condition, params, _ = build_search(table_name, search_query, column_names)
+    query = text(f"SELECT COUNT(*) FROM {table_name} WHERE {condition};")
+    return connection.execute(query, params).scalar()
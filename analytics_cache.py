@@ -0,0 +1,262 @@
+"""
+Optional local columnar copy of ExtractedActivities for report aggregations.
+
+When [analytics] cache_dir (or DESK_ANALYTICS_CACHE_DIR, see desk_db) is set,
+the scraper mirrors ExtractedActivities into Parquet files partitioned by date
+after each save and the report viewer aggregates over them with DuckDB
+instead of querying MySQL:
+
+    <cache_dir>/activities/Date=2024-11-26/part-<first id>-<last id>-0.parquet
+    <cache_dir>/sync_state.json         {"last_id": ..., "rows": ..., "format": ..., "synced_at": ...}
+
+Activities are only ever inserted by ingest (duplicates are no-op upserts), so
+a sync appends the rows with ids above last_id. Maintenance commands that
+delete or update stored rows rebuild the cache from scratch. pyarrow is
+needed to write the cache and duckdb to query it.
+"""
+import glob
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+
+from desk_db import load_settings
+
+SYNC_CHUNK_SIZE = 100_000
+
+# Date partitions holding more files than this are merged into one after a sync;
+# every file costs an open and a footer read per query
+MAX_PARTITION_FILES = 4
+
+# Mirrored columns; Date becomes the partition directory and Time is derivable from DateTimeStamp
+CACHE_COLUMNS = ("id", "Name", "ActivityType", "ActivityCategory", "DateTimeStamp", "TicketUrl", "Date")
+
+# Layout version recorded in sync_state.json; a cache written with another one is rebuilt.
+# Version 1 inferred column types per chunk, so all-NULL chunks got Arrow type null.
+CACHE_FORMAT = 2
+
+_duckdb_connection = None
+_duckdb_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def cache_schema():
+    """
+    The Arrow schema of every cache file, fixed rather than inferred per chunk: a chunk whose
+    ActivityCategory is all NULL (rows from before --backfill-categories) must still be
+    written as strings, or later files cannot be merged or read together.
+    """
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("Name", pa.string()),
+        ("ActivityType", pa.string()),
+        ("ActivityCategory", pa.string()),
+        ("DateTimeStamp", pa.timestamp("us")),
+        ("TicketUrl", pa.string()),
+        ("Date", pa.date32()),
+    ])
+
+
+def partition_file_schema():
+    """cache_schema without Date, which lives in the partition directory names."""
+    schema = cache_schema()
+    return schema.remove(schema.get_field_index("Date"))
+
+
+def analytics_cache_dir():
+    """The configured cache directory, or None when the cache is disabled."""
+    return load_settings()["cache_dir"] or None
+
+
+def read_sync_state(cache_dir):
+    """The cache's sync state, or None if it has never been synced."""
+    try:
+        with open(os.path.join(cache_dir, "sync_state.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_sync_state(cache_dir, state):
+    path = os.path.join(cache_dir, "sync_state.json")
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _remove_orphan_parts(activities_dir, last_id):
+    """Delete files left by a sync that died before recording its state (they would duplicate rows)."""
+    for path in glob.glob(os.path.join(activities_dir, "*", "part-*.parquet")):
+        first_id = int(os.path.basename(path).split("-")[1])
+        if first_id > last_id:
+            os.remove(path)
+
+
+def _compact_partitions(activities_dir, max_files=MAX_PARTITION_FILES):
+    """Merge the files of every date partition holding more than max_files into one. Returns partitions merged."""
+    import pyarrow.parquet as pq
+
+    merged = 0
+    for partition in glob.glob(os.path.join(activities_dir, "Date=*")):
+        paths = sorted(glob.glob(os.path.join(partition, "part-*.parquet")))
+        if len(paths) <= max_files:
+            continue
+        ids = [os.path.basename(path).split("-")[1:3] for path in paths]
+        first_id = min(int(first) for first, _ in ids)
+        last_id = max(int(last) for _, last in ids)
+        target = os.path.join(partition, f"part-{first_id}-{last_id}-0.parquet")
+        pq.write_table(pq.read_table(paths, schema=partition_file_schema()), f"{target}.tmp")
+        for path in paths:
+            os.remove(path)
+        os.replace(f"{target}.tmp", target)
+        merged += 1
+    return merged
+
+
+def _write_chunk(activities_dir, rows):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    table = pa.table(
+        {column: list(values) for column, values in zip(CACHE_COLUMNS, zip(*rows))}, schema=cache_schema()
+    )
+    ds.write_dataset(
+        table,
+        activities_dir,
+        format="parquet",
+        partitioning=["Date"],
+        partitioning_flavor="hive",
+        basename_template=f"part-{rows[0][0]}-{rows[-1][0]}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def sync_analytics_cache(connection, cache_dir, rebuild=False, chunk_size=SYNC_CHUNK_SIZE):
+    """
+    Append activities stored since the last sync to the cache, or rebuild it.
+    Args:
+        connection: MySQL database connection object.
+        cache_dir: Cache directory (see analytics_cache_dir).
+        rebuild: Re-export every activity (after deletes or updates of stored rows).
+        chunk_size: Rows read and written at a time.
+    Returns:
+        Number of rows added to the cache, or None if the sync failed.
+    """
+    start_time = time.perf_counter()
+    state = None if rebuild else read_sync_state(cache_dir)
+    if state and state.get("format") != CACHE_FORMAT:
+        logging.info("Analytics cache was written in an older format; rebuilding it.")
+        state = None
+    last_id = state["last_id"] if state else 0
+    activities_dir = os.path.join(cache_dir, "activities")
+    target_dir = activities_dir if state else f"{activities_dir}.new"
+    cursor = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        if state:
+            _remove_orphan_parts(activities_dir, last_id)
+        else:
+            shutil.rmtree(target_dir, ignore_errors=True)
+        cursor = connection.cursor()
+        cursor.execute(
+            f"SELECT {', '.join(CACHE_COLUMNS)} FROM ExtractedActivities WHERE id > %s ORDER BY id;",
+            (last_id,),
+        )
+        added = 0
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            _write_chunk(target_dir, rows)
+            added += len(rows)
+            last_id = rows[-1][0]
+        _compact_partitions(target_dir)
+        if not state:
+            # Swap the rebuilt copy in only once it is complete
+            os.makedirs(target_dir, exist_ok=True)
+            shutil.rmtree(activities_dir, ignore_errors=True)
+            os.replace(target_dir, activities_dir)
+        rows_total = (state["rows"] if state else 0) + added
+        _write_sync_state(cache_dir, {
+            "last_id": last_id, "rows": rows_total, "format": CACHE_FORMAT,
+            "synced_at": datetime.now().isoformat(timespec="seconds"),
+        })
+        logging.info(
+            f"Analytics cache {'synced' if state else 'rebuilt'}: {added} rows added, {rows_total} cached "
+            f"({time.perf_counter() - start_time:.2f}s)."
+        )
+        return added
+    except Exception as e:
+        logging.error(f"Error syncing analytics cache: {e}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def duckdb_cursor():
+    """
+    A cursor on the process-wide in-memory DuckDB connection, created on first use.
+    Reusing the connection keeps setup (tens of milliseconds) out of every report;
+    each caller gets its own cursor, as DuckDB connections are not shared across threads.
+    """
+    global _duckdb_connection
+    import duckdb
+
+    with _duckdb_lock:
+        if _duckdb_connection is None:
+            _duckdb_connection = duckdb.connect()
+        return _duckdb_connection.cursor()
+
+
+def cached_activity_counts(cache_dir, name_filter, start_time=None, end_time=None, expected_last_id=None):
+    """
+    Count activities per name and category from the cache (see report_queries.activity_counts).
+    Date partitions outside the window are skipped without being opened.
+    Args:
+        expected_last_id: MAX(id) of ExtractedActivities; when the cache has not synced up
+            to it the caller should query MySQL instead.
+    Returns:
+        List of (name, activity category, count) tuples ordered by name and category, or
+        None when the cache is unavailable or stale.
+    """
+    state = read_sync_state(cache_dir)
+    if not state or state.get("format") != CACHE_FORMAT:
+        return None
+    if expected_last_id is not None and state["last_id"] != expected_last_id:
+        return None
+    if not state["rows"]:
+        return []
+
+    conditions, params = ["ActivityCategory IS NOT NULL"], []
+    if name_filter != "All":
+        conditions.append("Name = ?")
+        params.append(name_filter)
+    if start_time is not None:
+        conditions += ["Date >= ?", "DateTimeStamp >= ?"]
+        params += [start_time.date(), start_time]
+    if end_time is not None:
+        conditions += ["Date <= ?", "DateTimeStamp <= ?"]
+        params += [end_time.date(), end_time]
+    files = os.path.join(cache_dir, "activities", "*", "*.parquet").replace("'", "''")
+    query = f"""
+    SELECT Name, ActivityCategory, COUNT(*) AS total_count
+    FROM read_parquet('{files}', hive_partitioning = true, hive_types = {{'Date': DATE}})
+    WHERE {" AND ".join(conditions)}
+    GROUP BY Name, ActivityCategory
+    ORDER BY Name, ActivityCategory
+    """
+    try:
+        with duckdb_cursor() as cursor:
+            return [tuple(row) for row in cursor.execute(query, params).fetchall()]
+    except ImportError:
+        return None
+    except Exception as e:
+        logging.error(f"Error reading analytics cache: {e}")
+        return None
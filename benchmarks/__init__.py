@@ -0,0 +1,4 @@
+"""Benchmarks for the desk ticket activity scraper and report viewer.
+
+Run from the repository root, e.g. ``python -m benchmarks.bench_extraction``.
+"""
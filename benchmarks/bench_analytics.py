@@ -0,0 +1,76 @@
+"""
+Compare report aggregation in MySQL with the local analytics cache.
+
+Fills a scratch database (BENCH_MYSQL_* environment variables) with synthetic
+activities, rebuilds the ActivityHourly rollup the MySQL path reads, syncs
+them into an analytics cache directory and times
+report_queries.activity_counts against analytics_cache.cached_activity_counts
+for 7, 30 and 90 day windows. Both must return the same counts.
+
+    python -m benchmarks.bench_analytics --rows 1000000
+"""
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+import TrueRCM_Desk_Tickets_Activity_Reporting_SQL_v1 as scraper
+from analytics_cache import cached_activity_counts, sync_analytics_cache
+from benchmarks.common import benchmark_parser, time_repeated, write_results
+from benchmarks.synthetic import BENCH_DATABASE, bench_engine_url, connect_bench_database, ensure_activity_rows
+from report_queries import activity_counts
+
+
+def main():
+    parser = benchmark_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Activities in the benchmark table.")
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30, 90], help="Report windows to time.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median is reported).")
+    parser.add_argument("--cache-dir", help="Cache directory to (re)build; a temporary one is used when omitted.")
+    args = parser.parse_args()
+
+    raw_connection = connect_bench_database()
+    total_rows = ensure_activity_rows(raw_connection, args.rows)
+    # Rows are bulk-loaded behind the scraper's back, after migration 6 filled the rollup
+    scraper.update_hourly_rollup(raw_connection)
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="desk_analytics_")
+    start = time.perf_counter()
+    sync_analytics_cache(raw_connection, cache_dir, rebuild=True)
+    sync_seconds = time.perf_counter() - start
+    raw_connection.close()
+
+    results = {"benchmark": "analytics", "rows": total_rows, "sync_seconds": round(sync_seconds, 2), "windows": []}
+    engine = create_engine(bench_engine_url("pymysql", BENCH_DATABASE))
+    now = datetime.now().replace(second=0, microsecond=0)
+    try:
+        with engine.connect() as connection:
+            last_id = connection.execute(text("SELECT MAX(id) FROM extractedActivities")).scalar()
+            # The first DuckDB query of a process pays a one-off setup cost
+            cached_activity_counts(cache_dir, "All", now - timedelta(days=1), now, last_id)
+            for days in args.days:
+                window = (now - timedelta(days=days), now)
+                mysql_counts, mysql_seconds = time_repeated(
+                    lambda: activity_counts(connection, "All", *window), args.repeat)
+                cache_counts, cache_seconds = time_repeated(
+                    lambda: cached_activity_counts(cache_dir, "All", *window, expected_last_id=last_id), args.repeat)
+                counts_match = sorted(tuple(row) for row in mysql_counts) == sorted(cache_counts or [])
+                assert counts_match, f"MySQL and cache counts differ for the {days} day window"
+                results["windows"].append({
+                    "days": days,
+                    "mysql_seconds": round(mysql_seconds, 4),
+                    "cache_seconds": round(cache_seconds, 4),
+                    "speedup": round(mysql_seconds / cache_seconds, 1) if cache_seconds else None,
+                    "counts_match": counts_match,
+                })
+    finally:
+        engine.dispose()
+        if not args.cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
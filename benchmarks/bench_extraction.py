@@ -0,0 +1,84 @@
+"""
+Compare per-element Selenium extraction with the single execute_script path
+and the page-source parser (the 'script' and 'html' extraction strategies).
+
+Loads a saved feed page (``driver.page_source`` written to disk) or a generated
+synthetic one into headless Chrome and times how long each approach takes to
+collect name, event title, aria-label date and ticket href for every item.
+
+    python -m benchmarks.bench_extraction --items 10000
+    python -m benchmarks.bench_extraction --page saved_feed.html
+"""
+import os
+import tempfile
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+
+import TrueRCM_Desk_Tickets_Activity_Reporting_SQL_v1 as scraper
+from benchmarks.common import benchmark_parser, time_call, write_results
+from benchmarks.feed_fixture import write_feed_fixture
+
+
+def collect_per_element(driver):
+    """The original extraction: four find_elements plus four get_attribute calls per row."""
+    names = driver.find_elements(By.CSS_SELECTOR, scraper.FEED_NAME_SELECTOR)
+    activity_types = driver.find_elements(By.CSS_SELECTOR, scraper.FEED_EVENT_SELECTOR)
+    times = driver.find_elements(By.CSS_SELECTOR, scraper.FEED_DATE_SELECTOR)
+    ticket_links = driver.find_elements(By.CSS_SELECTOR, scraper.FEED_TICKET_SELECTOR)
+    return [
+        [
+            names[i].get_attribute("title"),
+            activity_types[i].get_attribute("title"),
+            times[i].get_attribute("aria-label"),
+            ticket_links[i].get_attribute("href"),
+        ]
+        for i in range(len(names))
+    ]
+
+
+def main():
+    parser = benchmark_parser(__doc__)
+    parser.add_argument("--page", help="Saved feed page (HTML). A synthetic page is generated when omitted.")
+    parser.add_argument("--items", type=int, default=2000, help="Items in the synthetic page.")
+    args = parser.parse_args()
+
+    tmp_path = None
+    page = args.page
+    if not page:
+        fd, tmp_path = tempfile.mkstemp(suffix=".html")
+        os.close(fd)
+        write_feed_fixture(tmp_path, args.items)
+        page = tmp_path
+
+    driver = webdriver.Chrome(options=scraper.chrome_options)
+    try:
+        driver.get(Path(page).resolve().as_uri())
+        per_element, per_element_seconds = time_call(collect_per_element, driver)
+        bulk, bulk_seconds = time_call(scraper.collect_feed_items, driver)
+        parsed, html_seconds = time_call(scraper.collect_feed_items, driver, "html")
+        _, parse_seconds = time_call(scraper.build_activity_records, bulk)
+    finally:
+        driver.quit()
+        if tmp_path:
+            os.remove(tmp_path)
+
+    results = {
+        "benchmark": "extraction",
+        "page": args.page or f"synthetic:{args.items}",
+        "items": len(bulk),
+        "per_element_seconds": round(per_element_seconds, 4),
+        "bulk_seconds": round(bulk_seconds, 4),
+        "html_seconds": round(html_seconds, 4),
+        "bulk_parse_seconds": round(parse_seconds, 4),
+        "speedup": round(per_element_seconds / bulk_seconds, 1) if bulk_seconds else None,
+        "html_items_per_second": round(len(parsed) / html_seconds) if html_seconds else None,
+        "records_match": per_element == bulk,
+        "html_records_match": parsed == bulk,
+    }
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
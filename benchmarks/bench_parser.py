@@ -0,0 +1,89 @@
+"""
+Throughput of the offline page-source parser (feed_parser), no browser needed.
+
+Checks the parser against the edge-case fixture in benchmarks/fixtures, then
+parses synthetic feed pages (or a saved ``driver.page_source``) and reports
+records per second for parsing alone and for parsing plus
+build_activity_records.
+
+    python -m benchmarks.bench_parser --items 1000 10000 100000
+    python -m benchmarks.bench_parser --page saved_feed.html --base-url https://desk.example.com/agent/activity
+"""
+import json
+import statistics
+import time
+from pathlib import Path
+
+import TrueRCM_Desk_Tickets_Activity_Reporting_SQL_v1 as scraper
+from benchmarks.common import benchmark_parser, write_results
+from benchmarks.feed_fixture import generate_feed_items, render_feed_html
+from feed_parser import parse_feed_file, parse_feed_html
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def check_edge_cases():
+    """Parse the edge-case fixture and compare it with its expected rows. Returns True when they match."""
+    with open(FIXTURES / "feed_edge_cases.json", encoding="utf-8") as f:
+        expected = json.load(f)
+    rows = parse_feed_file(FIXTURES / "feed_edge_cases.html", expected["base_url"])
+    with open(FIXTURES / "feed_edge_cases.html", "rb") as f:
+        unharvested = parse_feed_html(f.read(), expected["base_url"], skip_harvested=True)
+    return rows == expected["rows"] and len(unharvested) == len(rows) - len(expected["harvested"])
+
+
+def time_parse(page_source, base_url, repeat):
+    """
+    Parse a page repeat times.
+    Returns:
+        (items, records, median parse seconds, median parse + build_activity_records seconds)
+    """
+    parse_timings, total_timings = [], []
+    items, records = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = parse_feed_html(page_source, base_url)
+        parsed = time.perf_counter()
+        records, _, _ = scraper.build_activity_records(items)
+        parse_timings.append(parsed - start)
+        total_timings.append(time.perf_counter() - start)
+    return items, records, statistics.median(parse_timings), statistics.median(total_timings)
+
+
+def main():
+    parser = benchmark_parser(__doc__)
+    parser.add_argument("--page", help="Saved feed page (HTML). Synthetic pages are generated when omitted.")
+    parser.add_argument("--base-url", help="URL the saved page was loaded from (resolves relative ticket links).")
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Items per synthetic page.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per page (median is reported).")
+    args = parser.parse_args()
+
+    if args.page:
+        pages = [(args.page, Path(args.page).read_bytes(), None)]
+    else:
+        pages = []
+        for n_items in args.items:
+            expected = [list(item) for item in generate_feed_items(n_items)]
+            pages.append((f"synthetic:{n_items}", render_feed_html(expected), expected))
+
+    results = {"benchmark": "parser", "edge_cases_match": check_edge_cases(), "pages": []}
+    for name, page_source, expected in pages:
+        items, records, parse_seconds, total_seconds = time_parse(page_source, args.base_url, args.repeat)
+        results["pages"].append({
+            "page": name,
+            "bytes": len(page_source),
+            "items": len(items),
+            "records": len(records),
+            "parse_seconds": round(parse_seconds, 4),
+            "parse_and_build_seconds": round(total_seconds, 4),
+            "items_per_second": round(len(items) / parse_seconds) if parse_seconds else None,
+            "records_per_second": round(len(records) / total_seconds) if total_seconds else None,
+            "items_match": items == expected if expected is not None else None,
+        })
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Time the ingest, summary and report hot paths against synthetic databases.
+
+For each size a scratch database (BENCH_MYSQL_* environment variables, named
+<BENCH_MYSQL_DATABASE>_<size>) is filled with synthetic activities once and
+reused by later runs. Then each size times:
+    save_to_db              a run of new activities, then the same run again (all duplicates)
+    summary updaters        the incremental refresh from the rows that run inserted
+    filter_by_team          the cleanup DELETE after non-team rows were added
+    report queries          activity_counts, read_page and count_rows as the viewer runs them
+
+Rows added during the run are deleted again afterwards, so repeated runs
+measure the same table. MySQL-specific SQL (ON DUPLICATE KEY, FULLTEXT,
+multi-table UPDATE) means a MySQL or MariaDB server is required.
+
+    python -m benchmarks.bench_pipeline --output before.json
+    python -m benchmarks.bench_pipeline --output after.json --compare before.json
+"""
+import json
+import platform
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+import TrueRCM_Desk_Tickets_Activity_Reporting_SQL_v1 as scraper
+from benchmarks.common import benchmark_parser, time_call, time_repeated, write_results
+from benchmarks.feed_fixture import FIXTURE_NAMES
+from benchmarks.synthetic import (
+    BENCH_DATABASE,
+    bench_engine_url,
+    connect_bench_database,
+    ensure_activity_rows,
+    generate_activity_rows,
+    load_activity_rows,
+)
+from report_queries import activity_counts, count_rows, page_start_key, read_page, table_columns
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+SEARCH_TERM = "assigned"
+
+
+def prepare_database(size):
+    """Fill the size's scratch database, seed the team and bring every summary up to date."""
+    connection = connect_bench_database(f"{BENCH_DATABASE}_{size}")
+    total_rows = ensure_activity_rows(connection, size)
+    cursor = connection.cursor()
+    cursor.executemany("INSERT IGNORE INTO TeamWiseSummary (Name) VALUES (%s);", [(name,) for name in FIXTURE_NAMES])
+    connection.commit()
+    cursor.close()
+    scraper.refresh_summaries(connection)
+    return connection, total_rows
+
+
+def max_activity_id(connection):
+    """Highest ExtractedActivities id, so rows added afterwards can be removed again."""
+    cursor = connection.cursor()
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM ExtractedActivities;")
+    max_id = cursor.fetchone()[0]
+    cursor.close()
+    return max_id
+
+
+def remove_activities_after(connection, max_id, inserted):
+    """Delete activities added by the benchmark and subtract the inserted ones from the summaries."""
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM ExtractedActivities WHERE id > %s;", (max_id,))
+    connection.commit()
+    cursor.close()
+    scraper.refresh_summaries(connection, inserted, removed=True)
+
+
+def bench_ingest(connection, size, new_rows, chunk_size):
+    """Time save_to_db, the incremental summary updaters and filter_by_team on one database."""
+    results = []
+    max_id = max_activity_id(connection)
+    # Recent rows, seeded apart from the prefill so they are new activities
+    data = list(generate_activity_rows(new_rows, days=2, seed=size * 7 + 1))
+
+    stats, seconds = time_call(scraper.save_to_db, connection, data, chunk_size)
+    results.append(("save_to_db_new", seconds, stats["changed"]))
+    inserted = stats["inserted"]
+    stats, seconds = time_call(scraper.save_to_db, connection, data, chunk_size)
+    results.append(("save_to_db_duplicates", seconds, stats["skipped"]))
+
+    dates = {row["Date"] for row in inserted}
+    hours = {scraper.activity_hour(row["DateTimeStamp"]) for row in inserted}
+    for operation, func, keys in (
+        ("update_date_summary", lambda: scraper.update_date_summary(connection, dates=dates), len(dates)),
+        ("apply_summary_deltas", lambda: scraper.apply_summary_deltas(connection, inserted), len(inserted)),
+        ("update_hourly_rollup", lambda: scraper.update_hourly_rollup(connection, hours=hours), len(hours)),
+    ):
+        _, seconds = time_call(func)
+        results.append((operation, seconds, keys))
+
+    outsiders = [f"Former Agent {i}" for i in range(5)]
+    load_activity_rows(connection, generate_activity_rows(new_rows // 5, names=outsiders, days=30, seed=size * 7 + 2))
+    deleted, seconds = time_call(scraper.filter_by_team, connection, FIXTURE_NAMES)
+    results.append(("filter_by_team", seconds, deleted))
+
+    remove_activities_after(connection, max_id, inserted)
+    return results
+
+
+def bench_reports(size, repeat):
+    """Time the report viewer's queries with the pymysql driver the Streamlit app uses."""
+    results = []
+    engine = create_engine(bench_engine_url("pymysql", f"{BENCH_DATABASE}_{size}"))
+    now = datetime.now().replace(second=0, microsecond=0)
+    try:
+        with engine.connect() as connection:
+            columns = table_columns(connection, "extractedactivities")
+            deep_key = page_start_key(connection, "extractedactivities", columns, size // 20, 10)
+            for operation, func in (
+                ("activity_counts_all_7d", lambda: activity_counts(connection, "All", now - timedelta(days=7), now)),
+                ("activity_counts_all_90d", lambda: activity_counts(connection, "All", now - timedelta(days=90), now)),
+                ("activity_counts_one_name_90d",
+                 lambda: activity_counts(connection, FIXTURE_NAMES[0], now - timedelta(days=90), now)),
+                ("activity_counts_all_time", lambda: activity_counts(connection, "All")),
+                ("read_page_first", lambda: read_page(connection, "extractedactivities", columns)),
+                ("read_page_deep",
+                 lambda: read_page(connection, "extractedactivities", columns, seek=("at", deep_key))),
+                ("read_page_search",
+                 lambda: read_page(connection, "extractedactivities", columns, search_query=SEARCH_TERM)),
+                ("count_rows", lambda: count_rows(connection, "extractedactivities", columns)),
+                ("count_rows_search",
+                 lambda: count_rows(connection, "extractedactivities", columns, SEARCH_TERM)),
+            ):
+                result, seconds = time_repeated(func, repeat)
+                rows = result if isinstance(result, int) else len(result)
+                results.append((operation, seconds, rows))
+    finally:
+        engine.dispose()
+    return results
+
+
+def print_comparison(results, baseline_path):
+    """Print each timing next to the matching one in an earlier results file."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    before = {(item["size"], item["operation"]): item["seconds"] for item in baseline["results"]}
+    print(f"\nCompared with {baseline.get('label') or baseline_path}:")
+    print(f"{'size':>9}  {'operation':<32}{'before':>10}{'after':>10}{'ratio':>8}")
+    for item in results["results"]:
+        old = before.get((item["size"], item["operation"]))
+        if old is None:
+            continue
+        ratio = item["seconds"] / old if old else float("inf")
+        print(f"{item['size']:>9}  {item['operation']:<32}{old:>10.4f}{item['seconds']:>10.4f}{ratio:>7.2f}x")
+
+
+def main():
+    parser = benchmark_parser(__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Table sizes to benchmark.")
+    parser.add_argument("--new-rows", type=int, default=5000, help="Activities ingested by the save_to_db run.")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Rows per INSERT statement in save_to_db.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per report query (median is reported).")
+    parser.add_argument("--label", help="Name for this run, e.g. a git commit.")
+    parser.add_argument("--compare", help="Earlier results JSON to print ratios against.")
+    args = parser.parse_args()
+
+    results = {
+        "benchmark": "pipeline",
+        "label": args.label,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "server": None,
+        "results": [],
+    }
+    for size in args.sizes:
+        connection, total_rows = prepare_database(size)
+        results["server"] = connection.get_server_info()
+        try:
+            timings = bench_ingest(connection, size, args.new_rows, args.chunk_size)
+        finally:
+            connection.close()
+        timings += bench_reports(size, args.repeat)
+        for operation, seconds, rows in timings:
+            results["results"].append({
+                "size": size,
+                "table_rows": total_rows,
+                "operation": operation,
+                "seconds": round(seconds, 4),
+                "rows": rows,
+            })
+            print(f"{size:>9}  {operation:<32}{seconds:>10.4f}s  ({rows} rows)")
+
+    write_results(results, args.output, echo=False)
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare the CONCAT_WS(...) LIKE search with the FULLTEXT search in activity_search.
+
+Fills a scratch database (BENCH_MYSQL_* environment variables, default
+TicketActivityBench on localhost) with synthetic activities, then times the
+page query and the count query of both approaches for a few search terms.
+
+    python -m benchmarks.bench_search --rows 1000000
+"""
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from activity_search import count_matches, search_rows
+from benchmarks.common import benchmark_parser, time_repeated, write_results
+from benchmarks.synthetic import bench_engine_url, connect_bench_database, ensure_activity_rows
+
+# The last term is the current month, searched as a DateTimeStamp range
+DEFAULT_TERMS = ["Ayesha", "assigned", "wrote reply", "tickets 4455", date.today().strftime("%Y-%m")]
+
+
+def main():
+    parser = benchmark_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Activities in the benchmark table.")
+    parser.add_argument("--terms", nargs="+", default=DEFAULT_TERMS, help="Search terms to time.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (median is reported).")
+    args = parser.parse_args()
+
+    raw_connection = connect_bench_database()
+    total_rows = ensure_activity_rows(raw_connection, args.rows)
+    server = raw_connection.get_server_info()
+    raw_connection.close()
+    engine = create_engine(bench_engine_url())
+
+    results = {"benchmark": "search", "rows": total_rows, "server": server, "terms": []}
+    with engine.connect() as connection:
+        column_names = [row[0] for row in connection.execute(text("DESCRIBE extractedactivities;"))]
+        like = f"CONCAT_WS(' ', {', '.join(f'`{c}`' for c in column_names)}) LIKE :q"
+
+        for term in args.terms:
+            like_params = {"q": f"%{term}%"}
+            like_count, like_count_s = time_repeated(
+                lambda: connection.execute(text(f"SELECT COUNT(*) FROM extractedactivities WHERE {like}"),
+                                           like_params).scalar(), args.repeat)
+            _, like_page_s = time_repeated(
+                lambda: pd.read_sql(text(f"SELECT * FROM extractedactivities WHERE {like} LIMIT 10"),
+                                    connection, params=like_params), args.repeat)
+            ft_count, ft_count_s = time_repeated(
+                lambda: count_matches(connection, "extractedactivities", term, column_names), args.repeat)
+            _, ft_page_s = time_repeated(
+                lambda: search_rows(connection, "extractedactivities", term, column_names, 10), args.repeat)
+            results["terms"].append({
+                "term": term,
+                "like_matches": like_count,
+                "fulltext_matches": ft_count,
+                "like_count_seconds": round(like_count_s, 4),
+                "like_page_seconds": round(like_page_s, 4),
+                "fulltext_count_seconds": round(ft_count_s, 4),
+                "fulltext_page_seconds": round(ft_page_s, 4),
+                "speedup": round((like_count_s + like_page_s) / (ft_count_s + ft_page_s), 1),
+            })
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
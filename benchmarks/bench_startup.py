@@ -0,0 +1,82 @@
+"""
+Time startup to the first feed item for a cold login and for reused sessions.
+
+Uses the portal URL and credentials from ConfigSetup (desk_db settings). Each
+round starts fresh browsers for:
+    cold            new empty profile, login form
+    warm_profile    the same profile directory again (session kept by Chrome)
+    warm_cookies    new empty profile, cookies saved by the cold login restored
+
+    python -m benchmarks.bench_startup --rounds 3
+"""
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import TrueRCM_Desk_Tickets_Activity_Reporting_SQL_v1 as scraper
+from benchmarks.common import benchmark_parser, write_results
+from desk_db import get_db_connection
+
+
+def time_to_feed(config, profile_dir, cookie_file=None):
+    """Start a browser and open the feed; returns (session mode, seconds to first item)."""
+    start = time.perf_counter()
+    driver = scraper.initialize_browser(profile_dir)
+    if not driver:
+        raise RuntimeError("Could not start Chrome.")
+    try:
+        mode = scraper.open_feed(
+            driver, config["base_url"], config["login_email"], config["login_password"], cookie_file=cookie_file
+        )
+        return mode, time.perf_counter() - start
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = benchmark_parser(__doc__)
+    parser.add_argument("--rounds", type=int, default=3, help="Cold/warm rounds to run (median is reported).")
+    args = parser.parse_args()
+
+    connection = get_db_connection()
+    if not connection:
+        raise SystemExit(1)
+    try:
+        config = scraper.get_config_details_from_db(connection)
+    finally:
+        connection.close()
+
+    timings = {"cold": [], "warm_profile": [], "warm_cookies": []}
+    modes = {name: [] for name in timings}
+    for _ in range(args.rounds):
+        work_dir = tempfile.mkdtemp(prefix="desk_startup_")
+        try:
+            profile_dir = os.path.join(work_dir, "profile")
+            cookie_file = os.path.join(work_dir, "cookies.json")
+            runs = [
+                ("cold", profile_dir, cookie_file),
+                ("warm_profile", profile_dir, None),
+                ("warm_cookies", os.path.join(work_dir, "fresh_profile"), cookie_file),
+            ]
+            for name, run_profile, run_cookies in runs:
+                mode, seconds = time_to_feed(config, run_profile, run_cookies)
+                timings[name].append(seconds)
+                modes[name].append(mode)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "benchmark": "startup",
+        "rounds": args.rounds,
+        "paths": {
+            name: {"median_seconds": round(statistics.median(values), 2), "sessions": modes[name]}
+            for name, values in timings.items()
+        },
+    }
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare the previous strptime/strftime timestamp handling with feed_timestamps.
+
+Times the work done per feed item from aria-label to the values handed to the
+DB writer: parsing in build_activity_records plus the date checks in
+sanitize_data. The previous path formatted the datetime back into strings
+and re-parsed them in sanitize_data, and its '%B %dth %Y' format rejected
+every 1st/2nd/3rd/22nd... date; both failure counts are reported.
+
+    python -m benchmarks.bench_timestamps --labels 100000
+"""
+import time
+from datetime import datetime
+
+from benchmarks.common import benchmark_parser, write_results
+from benchmarks.feed_fixture import generate_feed_items
+from feed_timestamps import as_date, as_datetime, parse_cache_info, parse_feed_timestamp
+
+
+def previous_values(aria_label):
+    """The aria-label to DB values path before feed_timestamps (strings throughout)."""
+    date, time_val = aria_label.split(", ")
+    activity_time = datetime.strptime(f"{date} {time_val}", "%B %dth %Y %H:%M:%S")
+    date_str = activity_time.strftime("%Y-%m-%d")
+    stamp = activity_time.strftime("%Y-%m-%d %H:%M:%S")
+    # sanitize_data
+    return (
+        datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m-%d"),
+        time_val,
+        datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S").strftime("%Y-%m-%d %H:%M:%S"),
+    )
+
+
+def current_values(aria_label):
+    """The aria-label to DB values path with feed_timestamps (typed values, parsed once)."""
+    activity_time = parse_feed_timestamp(aria_label)
+    # sanitize_data passes typed values straight through
+    return as_date(activity_time.date()), activity_time.time(), as_datetime(activity_time)
+
+
+def time_path(func, labels):
+    """Run func over every label; returns (seconds, failures)."""
+    failures = 0
+    start = time.perf_counter()
+    for label in labels:
+        try:
+            func(label)
+        except ValueError:
+            failures += 1
+    return time.perf_counter() - start, failures
+
+
+def main():
+    parser = benchmark_parser(__doc__)
+    parser.add_argument("--labels", type=int, default=100_000, help="Feed aria-labels to parse.")
+    args = parser.parse_args()
+
+    # Consecutive feed items a few minutes apart, so days repeat as they do in the feed
+    labels = [aria_label for _, _, aria_label, _ in generate_feed_items(args.labels)]
+    previous_seconds, previous_failures = time_path(previous_values, labels)
+    current_seconds, current_failures = time_path(current_values, labels)
+    cache = parse_cache_info()
+
+    results = {
+        "benchmark": "timestamps",
+        "labels": len(labels),
+        "distinct_days": len({label.split(", ")[0] for label in labels}),
+        "previous_seconds": round(previous_seconds, 4),
+        "previous_failures": previous_failures,
+        "current_seconds": round(current_seconds, 4),
+        "current_failures": current_failures,
+        "current_labels_per_second": round(len(labels) / current_seconds) if current_seconds else None,
+        "date_cache_hits": cache.hits,
+        "date_cache_misses": cache.misses,
+        "speedup": round(previous_seconds / current_seconds, 1) if current_seconds else None,
+    }
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Timing helpers and command-line scaffolding shared by the benchmark scripts."""
+import argparse
+import json
+import statistics
+import time
+
+
+def time_call(func, *args, **kwargs):
+    """Run func once and return (result, seconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def time_repeated(func, repeat):
+    """Run func repeat times and return (last result, median seconds)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        result, seconds = time_call(func)
+        timings.append(seconds)
+    return result, statistics.median(timings)
+
+
+def benchmark_parser(description):
+    """Argument parser showing the benchmark's docstring as help, with the shared --output option."""
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    return parser
+
+
+def write_results(results, output=None, echo=True):
+    """Print results as JSON (unless echo is False) and write them to output when given."""
+    if echo:
+        print(json.dumps(results, indent=2))
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
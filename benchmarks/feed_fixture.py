@@ -0,0 +1,75 @@
+"""Synthetic activity feed pages shaped like the desk portal's activity feed."""
+import random
+from datetime import datetime, timedelta
+from html import escape
+
+from activity_categories import ACTIVITY_CATEGORIES
+
+FIXTURE_NAMES = [
+    "Ayesha Rahman", "Brian Cole", "Carlos Mendes", "Deepa Iyer", "Ethan Brooks",
+    "Farhan Ali", "Grace Kim", "Hannah Lewis", "Imran Hossain", "Julia Novak",
+]
+
+
+def ordinal(day):
+    """Return the day of month with its English ordinal suffix (1st, 2nd, 3rd, 11th, 22nd...)."""
+    if 10 <= day % 100 <= 20:
+        suffix = "th"
+    else:
+        suffix = {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return f"{day}{suffix}"
+
+
+def feed_aria_label(moment):
+    """Format a datetime the way the feed's date span aria-label does."""
+    return f"{moment.strftime('%B')} {ordinal(moment.day)} {moment.year}, {moment.strftime('%H:%M:%S')}"
+
+
+def generate_feed_items(n_items, start=None, seed=42):
+    """
+    Generate n_items feed entries, newest first.
+    Returns a list of (name, activity_type, aria_label, ticket_url).
+    """
+    rng = random.Random(seed)
+    moment = start or datetime(2024, 11, 26, 19, 32, 26)
+    items = []
+    for _ in range(n_items):
+        moment -= timedelta(seconds=rng.randint(1, 240))
+        ticket_id = rng.randint(10000, 99999)
+        items.append((
+            rng.choice(FIXTURE_NAMES),
+            rng.choice(ACTIVITY_CATEGORIES),
+            feed_aria_label(moment),
+            f"https://desk.example.com/agent/tickets/{ticket_id}",
+        ))
+    return items
+
+
+def render_feed_html(items):
+    """Render feed items as a standalone HTML page using the portal's class names."""
+    rows = []
+    for name, activity_type, aria_label, ticket_url in items:
+        rows.append(
+            '<li class="activity-group__list-item">'
+            '<div class="activity-group__list-item-content">'
+            f'<div class="user-info"><span class="user-info__user-name" title="{escape(name)}">{escape(name)}</span> '
+            f'<span class="user-info__event-name" title="{escape(activity_type)}">{escape(activity_type)}</span></div>'
+            f'<a class="details__ticket-subject" href="{escape(ticket_url)}">Ticket</a>'
+            '<div class="activity-group__list-item-content--date">'
+            f'<span aria-label="{escape(aria_label)}">{escape(aria_label.split(", ")[1])}</span></div>'
+            '</div></li>'
+        )
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Activity feed</title></head>"
+        "<body><div id=\"app\"><ul class=\"activity-group__list\">"
+        + "".join(rows)
+        + "</ul></div></body></html>"
+    )
+
+
+def write_feed_fixture(path, n_items, seed=42):
+    """Write a synthetic feed page with n_items entries to path and return the items."""
+    items = generate_feed_items(n_items, seed=seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_feed_html(items))
+    return items
@@ -0,0 +1,116 @@
+"""Synthetic ExtractedActivities rows and a scratch benchmark database."""
+import os
+import random
+from datetime import datetime, timedelta
+from urllib.parse import quote_plus
+
+import mysql.connector
+from mysql.connector.constants import ClientFlag
+
+from activity_categories import ACTIVITY_CATEGORIES, categorize_activity
+from benchmarks.feed_fixture import FIXTURE_NAMES
+from schema_migrations import apply_migrations
+
+# Relative frequency of each category in a typical feed (viewing dominates)
+CATEGORY_WEIGHTS = {
+    "Viewed ticket": 30, "Changed status": 12, "Wrote a reply": 10, "Assigned to": 8,
+    "Added a note": 7, "Ticket Received": 6, "Added a tag": 5, "Customer": 4,
+}
+
+BENCH_DATABASE = os.environ.get("BENCH_MYSQL_DATABASE", "TicketActivityBench")
+BENCH_SETTINGS = {
+    "host": os.environ.get("BENCH_MYSQL_HOST", "localhost"),
+    "port": int(os.environ.get("BENCH_MYSQL_PORT", "3306")),
+    "user": os.environ.get("BENCH_MYSQL_USER", "root"),
+    "password": os.environ.get("BENCH_MYSQL_PASSWORD", ""),
+}
+
+
+def generate_activity_rows(n_rows, names=None, days=90, end=None, seed=42):
+    """
+    Yield n_rows activity records shaped like build_activity_records output.
+    Timestamps are spread over the last `days` days with most activity in working hours.
+    """
+    rng = random.Random(seed)
+    names = names or FIXTURE_NAMES
+    categories = list(ACTIVITY_CATEGORIES)
+    weights = [CATEGORY_WEIGHTS.get(category, 1) for category in categories]
+    end = end or datetime.now().replace(microsecond=0)
+    start = end - timedelta(days=days)
+    for _ in range(n_rows):
+        day = start + timedelta(days=rng.randrange(days))
+        hour = min(23, max(0, int(rng.gauss(13, 3))))
+        moment = day.replace(hour=hour, minute=rng.randrange(60), second=rng.randrange(60))
+        activity_type = rng.choices(categories, weights)[0]
+        yield {
+            "Name": rng.choice(names),
+            "ActivityType": activity_type,
+            "ActivityCategory": categorize_activity(activity_type),
+            "Date": moment.strftime("%Y-%m-%d"),
+            "Time": moment.strftime("%H:%M:%S"),
+            "DateTimeStamp": moment.strftime("%Y-%m-%d %H:%M:%S"),
+            "TicketUrl": f"https://desk.example.com/agent/tickets/{rng.randint(10000, 999999)}",
+        }
+
+
+def connect_bench_database(database=BENCH_DATABASE):
+    """
+    Connect to (creating if needed) a scratch benchmark database and migrate it.
+    Rowcounts report changed rows like the scraper's pooled connections (see desk_db).
+    """
+    connection = mysql.connector.connect(**BENCH_SETTINGS, client_flags=[-ClientFlag.FOUND_ROWS])
+    cursor = connection.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}`;")
+    cursor.execute(f"USE `{database}`;")
+    cursor.close()
+    apply_migrations(connection)
+    return connection
+
+
+def bench_engine_url(driver="mysqlconnector", database=BENCH_DATABASE):
+    """SQLAlchemy URL for a benchmark database."""
+    return (f"mysql+{driver}://{BENCH_SETTINGS['user']}:{quote_plus(BENCH_SETTINGS['password'])}"
+            f"@{BENCH_SETTINGS['host']}:{BENCH_SETTINGS['port']}/{database}")
+
+
+def load_activity_rows(connection, rows, chunk_size=2000):
+    """Bulk-load generated rows with multi-row INSERT IGNORE. Returns the number of rows sent."""
+    columns = ("Name", "ActivityType", "ActivityCategory", "Date", "Time", "DateTimeStamp", "TicketUrl")
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    cursor = connection.cursor()
+    sent = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            sent += _insert_chunk(connection, cursor, columns, placeholders, chunk)
+            chunk = []
+    if chunk:
+        sent += _insert_chunk(connection, cursor, columns, placeholders, chunk)
+    cursor.close()
+    return sent
+
+
+def _insert_chunk(connection, cursor, columns, placeholders, chunk):
+    cursor.execute(
+        f"INSERT IGNORE INTO ExtractedActivities ({', '.join(columns)}) VALUES "
+        + ", ".join([placeholders] * len(chunk)),
+        [row[column] for row in chunk for column in columns],
+    )
+    connection.commit()
+    return len(chunk)
+
+
+def ensure_activity_rows(connection, n_rows, seed=42):
+    """Top ExtractedActivities up to at least n_rows synthetic rows. Returns the final row count."""
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM ExtractedActivities;")
+    existing = cursor.fetchone()[0]
+    cursor.close()
+    if existing < n_rows:
+        load_activity_rows(connection, generate_activity_rows(n_rows - existing, seed=seed + existing))
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM ExtractedActivities;")
+    total = cursor.fetchone()[0]
+    cursor.close()
+    return total
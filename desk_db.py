@@ -0,0 +1,227 @@
+"""
+Shared database access for the scraper and the Streamlit apps.
+
+Settings come from DESK_DB_* environment variables, then from an INI file
+(desk_db.ini next to this module, or the path in DESK_DB_CONFIG), then from
+the defaults below:
+
+    [database]
+    host = localhost
+    port = 3306
+    user = root
+    # Required; there is no default password
+    password = ...
+    database = TicketActivityDB
+
+    [pool]
+    pool_size = 5
+    max_overflow = 10
+    pool_timeout = 30
+    pool_recycle = 1800
+
+    [analytics]
+    # Empty disables the local analytics cache (see analytics_cache.py)
+    cache_dir =
+
+One pooled engine is created per driver and process: the Streamlit apps use
+pymysql through SQLAlchemy, the scraper borrows raw mysql.connector
+connections from the same kind of pool via get_db_connection().
+"""
+import configparser
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL
+from sqlalchemy.pool import QueuePool
+
+CONFIG_PATH = os.environ.get("DESK_DB_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "desk_db.ini"))
+
+# (section, key) -> (environment variable, default)
+SETTINGS = {
+    ("database", "host"): ("DESK_DB_HOST", "localhost"),
+    ("database", "port"): ("DESK_DB_PORT", "3306"),
+    ("database", "user"): ("DESK_DB_USER", "root"),
+    ("database", "password"): ("DESK_DB_PASSWORD", ""),
+    ("database", "database"): ("DESK_DB_NAME", "TicketActivityDB"),
+    ("pool", "pool_size"): ("DESK_DB_POOL_SIZE", "5"),
+    ("pool", "max_overflow"): ("DESK_DB_MAX_OVERFLOW", "10"),
+    ("pool", "pool_timeout"): ("DESK_DB_POOL_TIMEOUT", "30"),
+    ("pool", "pool_recycle"): ("DESK_DB_POOL_RECYCLE", "1800"),
+    ("analytics", "cache_dir"): ("DESK_ANALYTICS_CACHE_DIR", ""),
+}
+
+_engines = {}
+_engines_lock = threading.Lock()
+_metrics_lock = threading.Lock()
+_metrics = {
+    "checkouts": 0,
+    "checkins": 0,
+    "connects": 0,
+    "invalidations": 0,
+    "checkout_timeouts": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0,
+}
+
+
+def load_settings(path=CONFIG_PATH):
+    """
+    Resolve connection and pool settings (environment > config file > defaults).
+    Returns:
+        dict with host, port, user, password, database, pool_size, max_overflow,
+        pool_timeout, pool_recycle and cache_dir.
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    if os.path.exists(path):
+        parser.read(path, encoding="utf-8")
+    settings = {}
+    for (section, key), (env_name, default) in SETTINGS.items():
+        value = os.environ.get(env_name)
+        if value is None:
+            value = parser.get(section, key, fallback=default)
+        settings[key] = value
+    for key in ("port", "pool_size", "max_overflow", "pool_timeout", "pool_recycle"):
+        settings[key] = int(settings[key])
+    return settings
+
+
+def _record(name, amount=1):
+    with _metrics_lock:
+        _metrics[name] += amount
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to check out a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            _record("checkout_timeouts")
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with _metrics_lock:
+                _metrics["wait_seconds_total"] += waited
+                _metrics["wait_seconds_max"] = max(_metrics["wait_seconds_max"], waited)
+
+
+def _attach_pool_events(engine):
+    event.listen(engine, "checkout", lambda *args: _record("checkouts"))
+    event.listen(engine, "checkin", lambda *args: _record("checkins"))
+    event.listen(engine, "connect", lambda *args: _record("connects"))
+    # Fired when pre-ping (or an error) finds a stale connection and replaces it
+    event.listen(engine, "invalidate", lambda *args: _record("invalidations"))
+
+
+def get_engine(driver="pymysql"):
+    """
+    Return the process-wide pooled engine for a driver, creating it on first use.
+    Connections are pre-pinged on checkout and recycled before MySQL's wait_timeout
+    can drop them, so idle dashboards do not hit stale-connection errors.
+    Args:
+        driver: 'pymysql' for the Streamlit apps, 'mysqlconnector' for the scraper.
+    Raises:
+        RuntimeError: if no database password is configured.
+    """
+    with _engines_lock:
+        if driver in _engines:
+            return _engines[driver]
+        settings = load_settings()
+        if not settings["password"]:
+            raise RuntimeError(
+                f"No database password configured: set DESK_DB_PASSWORD or [database] password in {CONFIG_PATH}."
+            )
+        url = URL.create(
+            f"mysql+{driver}",
+            username=settings["user"],
+            password=settings["password"],
+            host=settings["host"],
+            port=settings["port"],
+            database=settings["database"],
+        )
+        connect_args = {}
+        if driver == "mysqlconnector":
+            from mysql.connector.constants import ClientFlag
+
+            # Report affected (changed) rows rather than matched rows, so no-op upserts count as 0
+            connect_args["client_flags"] = [-ClientFlag.FOUND_ROWS]
+        engine = create_engine(
+            url,
+            poolclass=MeteredQueuePool,
+            pool_size=settings["pool_size"],
+            max_overflow=settings["max_overflow"],
+            pool_timeout=settings["pool_timeout"],
+            pool_recycle=settings["pool_recycle"],
+            pool_pre_ping=True,
+            connect_args=connect_args,
+        )
+        _attach_pool_events(engine)
+        _engines[driver] = engine
+        return engine
+
+
+def get_db_connection():
+    """
+    Borrow a raw mysql.connector connection from the pool (close() returns it).
+    Returns:
+        The DB-API connection, or None if the database is unreachable.
+    """
+    try:
+        connection = get_engine("mysqlconnector").raw_connection()
+        logging.info("Database connection established.")
+        return connection
+    except Exception as err:
+        logging.error(f"Database connection error: {err}")
+        return None
+
+
+def pool_metrics():
+    """
+    Snapshot of pool activity across all engines in this process.
+    Returns:
+        dict of counters (checkouts, connects, invalidations, checkout_timeouts,
+        wait totals) plus the live size/checked-out/overflow of each engine's pool.
+    """
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    metrics["wait_seconds_avg"] = metrics["wait_seconds_total"] / metrics["checkouts"] if metrics["checkouts"] else 0.0
+    with _engines_lock:
+        metrics["pools"] = {
+            driver: {
+                "size": engine.pool.size(),
+                "checked_out": engine.pool.checkedout(),
+                "overflow": engine.pool.overflow(),
+            }
+            for driver, engine in _engines.items()
+        }
+    return metrics
+
+
+@contextmanager
+def statement_timeout(connection, seconds):
+    """
+    Cap the run time of SELECT statements on a SQLAlchemy connection for the block.
+    Uses max_execution_time on MySQL and max_statement_time on MariaDB, and resets it
+    afterwards so the pooled connection goes back without the limit.
+    Args:
+        connection: SQLAlchemy Connection.
+        seconds: Time limit; None or 0 disables it.
+    """
+    if not seconds:
+        yield connection
+        return
+    if connection.dialect.is_mariadb:
+        variable, value = "max_statement_time", float(seconds)
+    else:
+        variable, value = "max_execution_time", int(seconds * 1000)
+    connection.execute(text(f"SET SESSION {variable} = {value}"))
+    try:
+        yield connection
+    finally:
+        connection.execute(text(f"SET SESSION {variable} = 0"))
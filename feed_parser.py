@@ -0,0 +1,86 @@
+"""
+Offline extraction of activity feed items from a page-source snapshot.
+
+Parses driver.page_source (or a saved copy of the feed page) with lxml and
+returns the same [name, activity_type, aria_label, ticket_url] rows as the
+scraper's FEED_EXTRACT_SCRIPT, so build_activity_records can turn either into
+ExtractedActivities records. Items are paired per container exactly like the
+script does: the closest .activity-group__list-item, or the highest ancestor
+of the name that still holds a single item.
+"""
+from urllib.parse import urljoin
+
+from lxml import etree, html
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# XPath equivalents of the scraper's FEED_*_SELECTOR CSS selectors
+NAME_XPATH = etree.XPath(f"//*[{_has_class('user-info__user-name')}]")
+EVENT_XPATH = etree.XPath(f"(.//*[{_has_class('user-info__event-name')}])[1]")
+DATE_XPATH = etree.XPath(f"(.//*[{_has_class('activity-group__list-item-content--date')}]//span)[1]")
+TICKET_XPATH = etree.XPath(f"(.//a[{_has_class('details__ticket-subject')}])[1]")
+ITEM_XPATH = etree.XPath(f"ancestor-or-self::*[{_has_class('activity-group__list-item')}][1]")
+NAMES_BELOW_XPATH = etree.XPath(f"count(.//*[{_has_class('user-info__user-name')}])")
+
+# Set on name nodes by the scraper's harvest scripts once they have been read
+HARVESTED_ATTRIBUTE = "data-desk-harvested"
+
+
+def container_of(name_el):
+    """The element holding one feed item's fields (mirrors containerOf in FEED_ROW_JS)."""
+    items = ITEM_XPATH(name_el)
+    if items:
+        return items[0]
+    node = name_el.getparent()
+    while node is not None and not DATE_XPATH(node):
+        parent = node.getparent()
+        if parent is None or NAMES_BELOW_XPATH(parent) > 1:
+            break
+        node = parent
+    return node
+
+
+def read_row(name_el, item, base_url=None):
+    """One [name, activity_type, aria_label, ticket_url] row; missing fields are None."""
+    event = EVENT_XPATH(item) if item is not None else []
+    date = DATE_XPATH(item) if item is not None else []
+    link = TICKET_XPATH(item) if item is not None else []
+    ticket_url = None
+    if link and link[0].get("href") is not None:
+        # The script reads link.href, which the browser has already resolved
+        ticket_url = urljoin(base_url, link[0].get("href")) if base_url else link[0].get("href")
+    return [
+        name_el.get("title"),
+        event[0].get("title") if event else None,
+        date[0].get("aria-label") if date else None,
+        ticket_url,
+    ]
+
+
+def parse_feed_html(page_source, base_url=None, skip_harvested=False):
+    """
+    Extract feed items from page HTML.
+    Args:
+        page_source: HTML of the feed page (str or bytes).
+        base_url: URL the page was loaded from, used to resolve relative ticket links.
+        skip_harvested: Leave out items the scraper's harvest scripts already marked as read.
+    Returns:
+        List of [name, activity_type, aria_label, ticket_url] in document order.
+    """
+    if not page_source:
+        return []
+    document = html.document_fromstring(page_source)
+    return [
+        read_row(name_el, container_of(name_el), base_url)
+        for name_el in NAME_XPATH(document)
+        if not (skip_harvested and name_el.get(HARVESTED_ATTRIBUTE) is not None)
+    ]
+
+
+def parse_feed_file(path, base_url=None):
+    """Extract feed items from a saved page-source file (see parse_feed_html)."""
+    with open(path, "rb") as f:
+        return parse_feed_html(f.read(), base_url)
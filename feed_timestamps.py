@@ -0,0 +1,70 @@
+"""
+Parsing of the activity feed's date aria-labels, e.g. 'November 26th 2024, 19:32:26'.
+
+Every ordinal suffix (1st, 2nd, 3rd, 22nd...) is accepted by one precompiled
+pattern. The date part of a label is memoized, since thousands of feed items
+share a day, so a label costs one regex match and a few int() calls.
+Results are datetime objects that go to the database as they are.
+"""
+import re
+from datetime import date, datetime, time
+from functools import lru_cache
+
+# English month names as the portal renders them, independent of the process locale
+MONTHS = {
+    name: number for number, name in enumerate(
+        ("january", "february", "march", "april", "may", "june", "july",
+         "august", "september", "october", "november", "december"),
+        start=1,
+    )
+}
+
+ARIA_LABEL_PATTERN = re.compile(
+    r"\s*(?P<month>[A-Za-z]+)\s+(?P<day>\d{1,2})(?:st|nd|rd|th)?\s+(?P<year>\d{4})"
+    r"\s*,\s*(?P<hour>\d{1,2}):(?P<minute>\d{2}):(?P<second>\d{2})\s*"
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(month, day, year):
+    try:
+        return date(int(year), MONTHS[month.lower()], int(day))
+    except KeyError:
+        raise ValueError(f"unknown month {month!r}") from None
+
+
+def parse_feed_timestamp(aria_label):
+    """
+    Parse a feed aria-label such as 'November 26th 2024, 19:32:26' into a datetime.
+    datetime values are returned unchanged.
+    Raises:
+        ValueError: if the label is not a feed date.
+    """
+    if isinstance(aria_label, datetime):
+        return aria_label
+    match = ARIA_LABEL_PATTERN.fullmatch(aria_label)
+    if not match:
+        raise ValueError(f"unrecognised feed timestamp {aria_label!r}")
+    day = _parse_date(match["month"], match["day"], match["year"])
+    return datetime.combine(day, time(int(match["hour"]), int(match["minute"]), int(match["second"])))
+
+
+def as_date(value):
+    """A date from a date/datetime or a 'YYYY-MM-DD' string. Raises ValueError otherwise."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def as_datetime(value):
+    """A datetime from a datetime or a 'YYYY-MM-DD HH:MM:SS' string. Raises ValueError otherwise."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+
+
+def parse_cache_info():
+    """Hit/miss statistics of the memoized date parser (functools cache_info)."""
+    return _parse_date.cache_info()
@@ -0,0 +1,195 @@
+"""
+Streaming export of report queries to CSV, XLSX or Parquet files.
+
+Rows are read through a server-side (unbuffered) cursor in chunks of
+EXPORT_CHUNK_SIZE and each chunk is appended to the output file before the
+next one is fetched, so memory stays flat however many rows are exported.
+XLSX is written with openpyxl's write-only workbook and Parquet with a
+pyarrow ParquetWriter (one row group per chunk, typed from the cursor's
+column metadata); both libraries are only needed for their format.
+"""
+import csv
+import importlib.util
+import logging
+import os
+import tempfile
+import time
+
+from sqlalchemy import text
+
+EXPORT_CHUNK_SIZE = 5000
+
+# Rows per worksheet, leaving room for the header (Excel's limit is 1,048,576 rows)
+XLSX_SHEET_ROWS = 1_048_575
+
+# Display name -> (file extension, MIME type, module the writer needs)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv", None),
+    "Excel (XLSX)": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "openpyxl"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", "pyarrow"),
+}
+
+# MySQL protocol column type codes (cursor.description[i][1]) -> Arrow type name
+MYSQL_ARROW_TYPES = {
+    1: "int64", 2: "int64", 3: "int64", 8: "int64", 9: "int64", 13: "int64",  # TINY .. YEAR
+    4: "float64", 5: "float64",  # FLOAT, DOUBLE
+    0: "decimal", 246: "decimal",  # DECIMAL, NEWDECIMAL
+    7: "timestamp", 12: "timestamp",  # TIMESTAMP, DATETIME
+    10: "date32", 14: "date32",  # DATE, NEWDATE
+    11: "duration",  # TIME
+}
+
+
+def available_formats():
+    """Export formats whose writer library is installed."""
+    return [
+        name for name, (_, _, module) in EXPORT_FORMATS.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+def stream_chunks(connection, query, params=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Execute a query with a server-side cursor.
+    Returns:
+        (column names, cursor.description, iterator of row lists of at most chunk_size rows)
+    """
+    result = connection.execution_options(stream_results=True, max_row_buffer=chunk_size).execute(
+        text(query), params or {}
+    )
+    return list(result.keys()), result.cursor.description, result.partitions(chunk_size)
+
+
+def parquet_schema(columns, description=None):
+    """
+    Arrow schema for a result set, fixed before the first row is read so a column that
+    is NULL throughout a chunk keeps its type. Types come from the cursor description;
+    text, binary and unrecognised columns are stored as strings.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for index, column in enumerate(columns):
+        column_info = description[index] if description else None
+        arrow_type = MYSQL_ARROW_TYPES.get(column_info[1]) if column_info else None
+        if arrow_type == "decimal":
+            # description carries the display length, which is never below the precision
+            precision = min(max(column_info[4] or 38, 1), 38)
+            scale = min(column_info[5] or 0, precision)
+            fields.append(pa.field(column, pa.decimal128(precision, scale)))
+        elif arrow_type == "timestamp":
+            fields.append(pa.field(column, pa.timestamp("us")))
+        elif arrow_type == "duration":
+            fields.append(pa.field(column, pa.duration("us")))
+        elif arrow_type:
+            fields.append(pa.field(column, getattr(pa, arrow_type)()))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def write_csv(path, columns, chunks):
+    """Write chunks to a UTF-8 CSV file (with BOM, so Excel detects the encoding). Returns rows written."""
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            rows += len(chunk)
+    return rows
+
+
+def write_xlsx(path, columns, chunks):
+    """Write chunks to an XLSX workbook in write-only mode, starting a new sheet when one is full."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_rows = rows = 0
+    for chunk in chunks:
+        for row in chunk:
+            if sheet is None or sheet_rows == XLSX_SHEET_ROWS:
+                sheet = workbook.create_sheet(f"Sheet{len(workbook.worksheets) + 1}")
+                sheet.append(columns)
+                sheet_rows = 0
+            sheet.append(list(row))
+            sheet_rows += 1
+        rows += len(chunk)
+    if sheet is None:
+        workbook.create_sheet("Sheet1").append(columns)
+    workbook.save(path)
+    return rows
+
+
+def _as_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+
+
+def write_parquet(path, columns, chunks, description=None):
+    """
+    Write chunks to a Parquet file, one row group per chunk, all with the schema
+    parquet_schema builds from the cursor description.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema(columns, description)
+    as_text = [pa.types.is_string(field.type) for field in schema]
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            data = {
+                column: [_as_text(value) for value in values] if text_column else list(values)
+                for column, text_column, values in zip(columns, as_text, zip(*chunk))
+            }
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx, "parquet": write_parquet}
+
+
+def export_query(connection, query, params, export_format, path, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Stream a query's rows into a file.
+    Args:
+        connection: SQLAlchemy Connection (no statement timeout; exports may run long).
+        query: SELECT statement with :named parameters.
+        params: Parameters for the query.
+        export_format: Key of EXPORT_FORMATS.
+        path: Output file path.
+        chunk_size: Rows fetched and written at a time.
+    Returns:
+        Number of rows written.
+    """
+    extension = EXPORT_FORMATS[export_format][0]
+    start_time = time.perf_counter()
+    columns, description, chunks = stream_chunks(connection, query, params, chunk_size)
+    if extension == "parquet":
+        rows = write_parquet(path, columns, chunks, description)
+    else:
+        rows = WRITERS[extension](path, columns, chunks)
+    logging.info(
+        f"Exported {rows} rows to {extension.upper()} in {time.perf_counter() - start_time:.2f}s "
+        f"({os.path.getsize(path)} bytes)."
+    )
+    return rows
+
+
+def export_to_temp_file(connection, query, params, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Export into a new temporary file; the caller removes it when done.
+    Returns:
+        (path, rows written)
+    """
+    fd, path = tempfile.mkstemp(prefix="desk_export_", suffix=f".{EXPORT_FORMATS[export_format][0]}")
+    os.close(fd)
+    try:
+        return path, export_query(connection, query, params, export_format, path, chunk_size)
+    except Exception:
+        os.remove(path)
+        raise
@@ -0,0 +1,240 @@
+"""
+Query functions behind the report viewer, independent of Streamlit.
+
+The Streamlit app wraps these in st.cache_data with its pooled engine; the
+benchmarks call them directly. Every function takes an open SQLAlchemy
+connection, apart from add_time_since_last_activity which post-processes
+a fetched page.
+"""
+from datetime import timedelta
+
+import pandas as pd
+from sqlalchemy import text
+
+from activity_search import build_search, count_matches, search_rows
+
+# Keyset pagination order per table: (sort column, unique tie-breaker, direction)
+KEYSET_ORDER = {
+    "extractedactivities": ("DateTimeStamp", "id", "DESC"),
+    "datewisesummary": ("Date", "id", "DESC"),
+    "teamwisesummary": ("Name", "id", "ASC"),
+    "activitysummary": ("activityType", "id", "ASC"),
+}
+
+
+def table_columns(connection, table_name):
+    """Return the column names of a table."""
+    result = connection.execute(text(f"DESCRIBE {table_name};"))
+    return [row[0] for row in result]
+
+
+def keyset_order(table_name, columns):
+    """Return the (sort, tie-breaker, direction) keyset order for a table, or None to page with OFFSET."""
+    order = KEYSET_ORDER.get(table_name)
+    if order and order[0] in columns and order[1] in columns:
+        return order
+    if "id" in columns:
+        return ("id", "id", "ASC")
+    return None
+
+
+def build_seek_clause(order, seek):
+    """
+    Build the keyset predicate for a page seek.
+    Args:
+        order: (sort column, tie-breaker, direction) from keyset_order.
+        seek: ("first", None), ("after", key), ("before", key) or ("at", key), where key is
+            the (sort, tie-breaker) value pair of a page boundary row.
+    Returns:
+        (condition or None, params, ORDER BY clause, reverse) where reverse means the rows
+        were read backwards and must be flipped for display.
+    """
+    sort_column, tie_column, direction = order
+    mode, key = seek
+    backward = mode == "before"
+    scan = {"ASC": "DESC", "DESC": "ASC"}[direction] if backward else direction
+    order_by = f"ORDER BY {sort_column} {scan}" + ("" if sort_column == tie_column else f", {tie_column} {scan}")
+    if mode == "first" or key is None:
+        return None, {}, order_by, False
+    op = "<" if scan == "DESC" else ">"
+    tie_op = op + "=" if mode == "at" else op
+    if sort_column == tie_column:
+        return f"{tie_column} {tie_op} :seek_tie", {"seek_tie": key[-1]}, order_by, backward
+    condition = f"({sort_column} {op} :seek_sort OR ({sort_column} = :seek_sort AND {tie_column} {tie_op} :seek_tie))"
+    return condition, {"seek_sort": key[0], "seek_tie": key[-1]}, order_by, backward
+
+
+def read_page(connection, table_name, columns, limit=10, search_query=None, seek=("first", None), offset=0):
+    """
+    Read one page of a table with optional search.
+    Searches are ranked by relevance (see activity_search) and paged with offset.
+    Otherwise tables with a keyset order are paged by seeking past the boundary keys
+    of the neighbouring page, so latency stays flat however deep the page; other
+    tables fall back to LIMIT/OFFSET using offset.
+    """
+    if search_query:
+        return search_rows(connection, table_name, search_query, columns, limit, offset)
+
+    order = keyset_order(table_name, columns)
+    reverse = False
+    params = {}
+    query = f"SELECT * FROM {table_name}"
+    if order:
+        seek_condition, params, order_by, reverse = build_seek_clause(order, seek)
+        if seek_condition:
+            query += f" WHERE {seek_condition}"
+        query += f" {order_by} LIMIT {limit};"
+    else:
+        query += f" LIMIT {limit} OFFSET {offset};"
+
+    df = pd.read_sql(text(query), connection, params=params)
+    if reverse:
+        df = df.iloc[::-1].reset_index(drop=True)
+    return df
+
+
+def add_time_since_last_activity(df):
+    """Derive TimeSinceLastActivity from DateTimeStamp at read time instead of trusting the stored value."""
+    if "DateTimeStamp" not in df.columns or df.empty:
+        return df
+    elapsed = pd.Timestamp.now() - pd.to_datetime(df["DateTimeStamp"], errors="coerce")
+    df["TimeSinceLastActivity"] = [
+        str(delta.to_pytimedelta()).split(".")[0] if pd.notna(delta) else None for delta in elapsed
+    ]
+    return df
+
+
+def page_start_key(connection, table_name, columns, page_number, limit):
+    """
+    Find the boundary key of an arbitrary page for jump-to-page.
+    Skips over the (sort, tie-breaker) index entries only, which is far cheaper than an
+    OFFSET over full rows; the page itself is then read with an ("at", key) seek.
+    """
+    order = keyset_order(table_name, columns)
+    if not order or page_number <= 1:
+        return None
+    _, _, order_by, _ = build_seek_clause(order, ("first", None))
+    query = (f"SELECT {order[0]}, {order[1]} FROM {table_name} "
+             f"{order_by} LIMIT 1 OFFSET {(page_number - 1) * limit};")
+    row = connection.execute(text(query)).fetchone()
+    return tuple(row) if row else None
+
+
+def count_rows(connection, table_name, columns, search_query=None):
+    """Count the rows of a table, optionally only those matching a search query."""
+    if search_query:
+        if not columns:
+            return 0
+        return count_matches(connection, table_name, search_query, columns)
+    return connection.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+
+
+def activity_counts(connection, name_filter, start_time=None, end_time=None):
+    """
+    Count activities per name and category for the report window.
+    Whole hours inside the window are summed from the ActivityHourly rollup; only the
+    partial hours at either edge are counted from raw extractedActivities rows, so the
+    cost grows with the number of hours in the window rather than the number of activities.
+    Returns:
+        List of (name, activity category, count) tuples ordered by name and category.
+    """
+    params = {}
+    name_clause = ""
+    if name_filter != "All":
+        name_clause = " AND Name = :name_filter"
+        params["name_filter"] = name_filter
+
+    # Rollup hours fully inside [start_time, end_time] (DateTimeStamp has whole seconds)
+    first_hour = None
+    if start_time is not None:
+        first_hour = start_time.replace(minute=0, second=0, microsecond=0)
+        if first_hour < start_time:
+            first_hour += timedelta(hours=1)
+    end_hour = None
+    if end_time is not None:
+        end_hour = (end_time + timedelta(seconds=1)).replace(minute=0, second=0, microsecond=0)
+
+    rollup_ranges, raw_ranges = [], []
+    if first_hour is not None and end_hour is not None and first_hour >= end_hour:
+        # Window shorter than an hour boundary to boundary: count raw rows only
+        raw_ranges.append("DateTimeStamp >= :start_time AND DateTimeStamp <= :end_time")
+    else:
+        if first_hour is not None:
+            rollup_ranges.append("ActivityHour >= :first_hour")
+            raw_ranges.append("DateTimeStamp >= :start_time AND DateTimeStamp < :first_hour")
+        if end_hour is not None:
+            rollup_ranges.append("ActivityHour < :end_hour")
+            raw_ranges.append("DateTimeStamp >= :end_hour AND DateTimeStamp <= :end_time")
+    params.update(start_time=start_time, end_time=end_time, first_hour=first_hour, end_hour=end_hour)
+
+    parts = []
+    if rollup_ranges or not raw_ranges:
+        parts.append(f"""
+        SELECT Name, ActivityCategory, SUM(ActivityCount) AS total
+        FROM ActivityHourly
+        WHERE {" AND ".join(rollup_ranges) or "1 = 1"}{name_clause}
+        GROUP BY Name, ActivityCategory
+        """)
+    for raw_range in raw_ranges:
+        parts.append(f"""
+        SELECT Name, ActivityCategory, COUNT(*) AS total
+        FROM extractedActivities
+        WHERE ActivityCategory IS NOT NULL AND {raw_range}{name_clause}
+        GROUP BY Name, ActivityCategory
+        """)
+
+    query = f"""
+    SELECT Name AS name, ActivityCategory AS activityType, CAST(SUM(total) AS UNSIGNED) AS total_count
+    FROM ({" UNION ALL ".join(parts)}) AS window_counts
+    GROUP BY Name, ActivityCategory
+    HAVING total_count > 0
+    ORDER BY Name, ActivityCategory
+    """
+    result = connection.execute(text(query), params)
+    return [tuple(row) for row in result]
+
+
+def table_export_query(table_name, columns, search_query=None):
+    """
+    Build the query exporting a whole table, or only its rows matching a search.
+    Rows come in the viewer's keyset order rather than by relevance, so the server can
+    stream them along the index instead of sorting every match first.
+    Returns:
+        (query, params)
+    """
+    params = {}
+    query = f"SELECT * FROM {table_name}"
+    if search_query:
+        condition, params, _ = build_search(table_name, search_query, columns)
+        query += f" WHERE {condition}"
+    order = keyset_order(table_name, columns)
+    if order:
+        _, _, order_by, _ = build_seek_clause(order, ("first", None))
+        query += f" {order_by}"
+    return query, params
+
+
+def activity_export_query(name_filter, start_time=None, end_time=None):
+    """
+    Build the query exporting the raw activities behind a custom report window.
+    Returns:
+        (query, params)
+    """
+    conditions, params = [], {}
+    if name_filter != "All":
+        conditions.append("Name = :name_filter")
+        params["name_filter"] = name_filter
+    if start_time is not None:
+        conditions.append("DateTimeStamp >= :start_time")
+        params["start_time"] = start_time
+    if end_time is not None:
+        conditions.append("DateTimeStamp <= :end_time")
+        params["end_time"] = end_time
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+    SELECT Name, ActivityType, ActivityCategory, Date, Time, DateTimeStamp, TicketUrl
+    FROM extractedActivities
+    {where}
+    ORDER BY DateTimeStamp, id
+    """
+    return query, params
@@ -0,0 +1,121 @@
+"""
+Per-stage timing for scraper runs, persisted to the RunHistory table.
+
+    recorder = RunRecorder("scrape", connection)
+    with recorder.stage("save_to_db") as stage:
+        stats = save_to_db(connection, data)
+        stage["rows"] = stats["written"]
+    recorder.save("ok")
+
+A stage entered several times (e.g. once per streamed batch) accumulates its
+duration, rows and round trips. DB round trips are read from the session's
+'Questions' status counter around each stage.
+"""
+import logging
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+RUN_HISTORY_INSERT_SQL = """
+    INSERT INTO RunHistory
+        (run_id, run_kind, run_started_at, status, stage, stage_order, seconds, row_count, round_trips)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);
+"""
+
+
+def session_round_trips(connection):
+    """Statements this session has sent to the server so far, or None if unavailable."""
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SHOW SESSION STATUS LIKE 'Questions';")
+        row = cursor.fetchone()
+        cursor.close()
+        return int(row[1])
+    except Exception:
+        return None
+
+
+def template_name(stage_name):
+    """Email template variable for a stage's seconds, e.g. 'save_to_db' -> 'SaveToDbSeconds'."""
+    return "".join(part.capitalize() for part in stage_name.split("_")) + "Seconds"
+
+
+class RunRecorder:
+    """Collects per-stage duration, row count and DB round trips for one run."""
+
+    def __init__(self, kind, connection=None):
+        self.run_id = uuid.uuid4().hex
+        self.kind = kind
+        self.connection = connection
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self.stages = {}  # name -> totals, in the order stages first ran
+
+    @contextmanager
+    def stage(self, name):
+        """Time the block as stage `name`; set ["rows"] on the yielded dict to record a row count."""
+        totals = self.stages.setdefault(name, {"seconds": 0.0, "rows": None, "round_trips": None})
+        counts = {"rows": None}
+        before = session_round_trips(self.connection) if self.connection else None
+        start = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            totals["seconds"] += time.perf_counter() - start
+            if counts["rows"] is not None:
+                totals["rows"] = (totals["rows"] or 0) + counts["rows"]
+            after = session_round_trips(self.connection) if before is not None else None
+            if after is not None:
+                # The closing status query is itself counted in `after`
+                totals["round_trips"] = (totals["round_trips"] or 0) + after - before - 1
+
+    def total_seconds(self):
+        """Seconds since the recorder was created."""
+        return time.perf_counter() - self._start
+
+    def email_variables(self):
+        """
+        Per-stage template variables for populate_email_template: '<Stage>Seconds' for
+        every stage plus 'StageTimings', an HTML table of all stages.
+        """
+        variables = {template_name(name): round(totals["seconds"], 2) for name, totals in self.stages.items()}
+        rows = "".join(
+            f"<tr><td>{name}</td><td>{totals['seconds']:.2f}</td>"
+            f"<td>{'' if totals['rows'] is None else totals['rows']}</td>"
+            f"<td>{'' if totals['round_trips'] is None else totals['round_trips']}</td></tr>"
+            for name, totals in self.stages.items()
+        )
+        variables["StageTimings"] = (
+            "<table><tr><th>Stage</th><th>Seconds</th><th>Rows</th><th>DB round trips</th></tr>"
+            f"{rows}</table>"
+        )
+        return variables
+
+    def save(self, status="ok"):
+        """Write one RunHistory row per stage plus a 'total' row for the whole run."""
+        if not self.connection:
+            return
+        stage_rows = [
+            (self.run_id, self.kind, self.started_at, status, name, order, round(totals["seconds"], 3),
+             totals["rows"], totals["round_trips"])
+            for order, (name, totals) in enumerate(self.stages.items(), start=1)
+        ]
+        stage_rows.append((self.run_id, self.kind, self.started_at, status, "total", 0,
+                           round(self.total_seconds(), 3), None, None))
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.executemany(RUN_HISTORY_INSERT_SQL, stage_rows)
+            self.connection.commit()
+            logging.info(f"Run {self.run_id} ({status}) recorded with {len(self.stages)} stages.")
+        except Exception as e:
+            logging.error(f"Error saving run history: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+
+def timed_stage(recorder, name):
+    """recorder.stage(name), or a no-op stage when there is no recorder."""
+    return recorder.stage(name) if recorder else nullcontext({"rows": None})
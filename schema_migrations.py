@@ -0,0 +1,482 @@
+"""
+Versioned schema migrations for TicketActivityDB.
+
+Creates the tables the scraper and the Streamlit apps rely on, and upgrades
+databases that were created by hand: the unique key ON DUPLICATE KEY depends
+on, the indexes the hot queries need, and the columns added by later ingest
+changes. Applied versions are recorded in the SchemaMigrations table.
+
+Usage:
+    python schema_migrations.py                # apply pending migrations
+    python schema_migrations.py --status       # show applied versions
+    python schema_migrations.py --check-plans  # EXPLAIN the hot queries, fail on full scans
+"""
+import argparse
+import logging
+import sys
+
+from activity_categories import ACTIVITY_CATEGORIES
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+COUNTER_COLUMNS_DDL = ",\n    ".join(f"`{column}` INT NOT NULL DEFAULT 0" for column in ACTIVITY_CATEGORIES)
+
+BASELINE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS ExtractedActivities (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        Name VARCHAR(255) NOT NULL,
+        ActivityType VARCHAR(255) NOT NULL,
+        Date DATE NOT NULL,
+        Time TIME NOT NULL,
+        DateTimeStamp DATETIME NOT NULL,
+        TicketUrl TEXT NOT NULL,
+        TimeSinceLastActivity VARCHAR(255) NULL
+    );
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS TeamWiseSummary (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        Name VARCHAR(255) NOT NULL,
+        {COUNTER_COLUMNS_DDL},
+        `Total Count` INT NOT NULL DEFAULT 0
+    );
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS DateWiseSummary (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        Date DATE NOT NULL,
+        {COUNTER_COLUMNS_DDL},
+        `Total Count` INT NOT NULL DEFAULT 0
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS activitySummary (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        activityType VARCHAR(64) NOT NULL,
+        `count` INT NOT NULL DEFAULT 0
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ConfigSetup (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        email_recipient VARCHAR(255),
+        email_subject VARCHAR(255),
+        email_body TEXT,
+        base_url VARCHAR(512),
+        login_email VARCHAR(255),
+        login_password VARCHAR(255)
+    );
+    """,
+]
+
+# Secondary indexes on ExtractedActivities: (name, columns)
+ACTIVITY_INDEXES = [
+    ("idx_name_datetime", "Name, DateTimeStamp"),
+    ("idx_date_type", "Date, ActivityType"),
+    ("idx_datetime", "DateTimeStamp"),
+]
+
+# FULLTEXT search indexes per (lower-case) table: (index name, columns)
+SEARCH_INDEXES = {
+    "extractedactivities": ("ft_activity_search", ("Name", "ActivityType", "TicketUrl")),
+    "teamwisesummary": ("ft_teamwise_search", ("Name",)),
+    "activitysummary": ("ft_activity_summary_search", ("activityType",)),
+}
+
+# Bumped by the scraper whenever new data lands; readers key their caches on it
+DATA_VERSION_BUMP_SQL = """
+    INSERT INTO DataVersion (id, version) VALUES (1, 1)
+    ON DUPLICATE KEY UPDATE version = version + 1, updated_at = CURRENT_TIMESTAMP;
+"""
+DATA_VERSION_SELECT_SQL = "SELECT version FROM DataVersion WHERE id = 1;"
+
+# Start of the hour an activity falls in (no DATE_FORMAT, so no literal % for DB-API drivers)
+HOUR_BUCKET_SQL = "TIMESTAMP(DATE(DateTimeStamp), MAKETIME(HOUR(DateTimeStamp), 0, 0))"
+
+# Bookkeeping and rollup tables the report viewer does not list
+INTERNAL_TABLES = {"configsetup", "schemamigrations", "dataversion", "activityhourly", "ingestcheckpoint", "runhistory"}
+
+# Advanced by the scraper only after a run finished, so incremental runs resume from
+# the last complete scrape even if a streaming run saved newer batches and then failed
+INGEST_CHECKPOINT_SAVE_SQL = """
+    INSERT INTO IngestCheckpoint (id, high_water_mark)
+    SELECT 1, MAX(DateTimeStamp) FROM ExtractedActivities
+    ON DUPLICATE KEY UPDATE high_water_mark = VALUES(high_water_mark), updated_at = CURRENT_TIMESTAMP;
+"""
+
+# Tables small enough (bounded by team size, calendar days or category count)
+# that a full scan in a query plan is acceptable
+SMALL_TABLES = {"teamwisesummary", "datewisesummary", "activitysummary", "configsetup", "dataversion", "ingestcheckpoint"}
+
+
+# Helper Functions
+def hourly_rollup_sql(condition=None):
+    """
+    INSERT ... SELECT that rolls ExtractedActivities up into ActivityHourly.
+    Args:
+        condition: Optional extra SQL predicate on ExtractedActivities (e.g. DateTimeStamp
+            ranges of the hours being recomputed); all history when None.
+    """
+    return f"""
+        INSERT INTO ActivityHourly (ActivityHour, Name, ActivityCategory, ActivityCount)
+        SELECT {HOUR_BUCKET_SQL}, Name, ActivityCategory, COUNT(*)
+        FROM ExtractedActivities
+        WHERE ActivityCategory IS NOT NULL{f" AND ({condition})" if condition else ""}
+        GROUP BY {HOUR_BUCKET_SQL}, Name, ActivityCategory;
+    """
+
+
+def column_info(cursor, table_name, column_name):
+    """Return (is_nullable, column_type) for a column, or None if it does not exist."""
+    cursor.execute(
+        """
+        SELECT is_nullable, column_type FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND LOWER(table_name) = LOWER(%s)
+        AND LOWER(column_name) = LOWER(%s);
+        """,
+        (table_name, column_name),
+    )
+    return cursor.fetchone()
+
+
+def index_exists(cursor, table_name, index_name):
+    """Check whether an index with the given name exists on the table."""
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND LOWER(table_name) = LOWER(%s)
+        AND LOWER(index_name) = LOWER(%s);
+        """,
+        (table_name, index_name),
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def unique_indexes(cursor, table_name):
+    """Return {index_name: [columns]} for the non-primary unique indexes of a table."""
+    cursor.execute(
+        """
+        SELECT index_name, column_name FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND LOWER(table_name) = LOWER(%s)
+        AND non_unique = 0 AND index_name <> 'PRIMARY'
+        ORDER BY index_name, seq_in_index;
+        """,
+        (table_name,),
+    )
+    indexes = {}
+    for index_name, column_name in cursor.fetchall():
+        indexes.setdefault(index_name, []).append(column_name.lower())
+    return indexes
+
+
+def add_unique_key_if_missing(cursor, table_name, index_name, column):
+    """Add a single-column unique key unless some unique index already leads with that column."""
+    if any(columns[0] == column.lower() for columns in unique_indexes(cursor, table_name).values()):
+        return
+    logging.info(f"Adding unique key {index_name} on {table_name}({column}).")
+    cursor.execute(f"ALTER TABLE {table_name} ADD UNIQUE KEY {index_name} (`{column}`);")
+
+
+# Migrations
+def migrate_baseline(cursor):
+    """Create the base tables, their natural unique keys and the activitySummary rows."""
+    for statement in BASELINE_TABLES:
+        cursor.execute(statement)
+    add_unique_key_if_missing(cursor, "TeamWiseSummary", "uq_teamwise_name", "Name")
+    add_unique_key_if_missing(cursor, "DateWiseSummary", "uq_datewise_date", "Date")
+    add_unique_key_if_missing(cursor, "activitySummary", "uq_activity_type", "activityType")
+    cursor.execute(
+        f"INSERT IGNORE INTO activitySummary (activityType) VALUES {', '.join(['(%s)'] * len(ACTIVITY_CATEGORIES))};",
+        ACTIVITY_CATEGORIES,
+    )
+
+
+def migrate_activity_category(cursor):
+    """Add the indexed ActivityCategory column and make the legacy TimeSinceLastActivity nullable."""
+    if column_info(cursor, "ExtractedActivities", "ActivityCategory") is None:
+        cursor.execute("""
+            ALTER TABLE ExtractedActivities
+            ADD COLUMN ActivityCategory VARCHAR(32) NULL AFTER ActivityType;
+        """)
+    if not index_exists(cursor, "ExtractedActivities", "idx_activity_category"):
+        cursor.execute("ALTER TABLE ExtractedActivities ADD INDEX idx_activity_category (ActivityCategory);")
+    legacy = column_info(cursor, "ExtractedActivities", "TimeSinceLastActivity")
+    if legacy and legacy[0] == "NO":
+        cursor.execute(f"ALTER TABLE ExtractedActivities MODIFY TimeSinceLastActivity {legacy[1]} NULL;")
+
+
+def migrate_activity_keys(cursor):
+    """
+    Add the unique activity identity key that save_to_db's ON DUPLICATE KEY relies on,
+    plus the composite indexes used by the summary updaters and the report viewer.
+    Existing duplicates are removed (keeping the lowest id) before the key is added.
+    The indexes go in first so the duplicate lookup can use idx_name_datetime.
+    """
+    for index_name, columns in ACTIVITY_INDEXES:
+        if not index_exists(cursor, "ExtractedActivities", index_name):
+            logging.info(f"Adding index {index_name} ({columns}) to ExtractedActivities.")
+            cursor.execute(f"ALTER TABLE ExtractedActivities ADD INDEX {index_name} ({columns});")
+    existing = unique_indexes(cursor, "ExtractedActivities")
+    if existing and "uq_activity_identity" not in existing:
+        logging.info(f"ExtractedActivities already has unique key(s) {sorted(existing)}; keeping them.")
+    elif not existing:
+        # One grouping pass finds the duplicated identities; only their extra rows are joined back
+        cursor.execute("""
+            DELETE newer FROM ExtractedActivities AS newer
+            JOIN (
+                SELECT Name, ActivityType, DateTimeStamp, TicketUrl, MIN(id) AS keep_id
+                FROM ExtractedActivities
+                GROUP BY Name, ActivityType, DateTimeStamp, TicketUrl
+                HAVING COUNT(*) > 1
+            ) AS duplicate
+              ON newer.Name = duplicate.Name
+             AND newer.DateTimeStamp = duplicate.DateTimeStamp
+             AND newer.ActivityType = duplicate.ActivityType
+             AND newer.TicketUrl = duplicate.TicketUrl
+             AND newer.id > duplicate.keep_id;
+        """)
+        if cursor.rowcount:
+            logging.info(f"Removed {cursor.rowcount} duplicate activities before adding the unique key.")
+        cursor.execute("""
+            ALTER TABLE ExtractedActivities
+            ADD UNIQUE KEY uq_activity_identity (Name, ActivityType, DateTimeStamp, TicketUrl(255));
+        """)
+
+
+def migrate_data_version(cursor):
+    """Create the single-row DataVersion table used to invalidate report caches."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS DataVersion (
+            id TINYINT PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    cursor.execute(DATA_VERSION_BUMP_SQL)
+
+
+def migrate_search_indexes(cursor):
+    """Add the FULLTEXT indexes used by activity_search for MATCH ... AGAINST queries."""
+    for table_name, (index_name, columns) in SEARCH_INDEXES.items():
+        if not index_exists(cursor, table_name, index_name):
+            logging.info(f"Adding FULLTEXT index {index_name} on {table_name}({', '.join(columns)}).")
+            cursor.execute(f"ALTER TABLE {table_name} ADD FULLTEXT INDEX {index_name} ({', '.join(columns)});")
+
+
+def migrate_activity_hourly(cursor):
+    """Create the ActivityHourly rollup behind the Custom Activity Report and fill it from history."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ActivityHourly (
+            ActivityHour DATETIME NOT NULL,
+            Name VARCHAR(255) NOT NULL,
+            ActivityCategory VARCHAR(32) NOT NULL,
+            ActivityCount INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (ActivityHour, Name, ActivityCategory),
+            KEY idx_name_hour (Name, ActivityHour)
+        );
+    """)
+    cursor.execute("DELETE FROM ActivityHourly;")
+    cursor.execute(hourly_rollup_sql())
+    logging.info(f"ActivityHourly backfilled with {cursor.rowcount} rows.")
+
+
+def migrate_ingest_checkpoint(cursor):
+    """Create the single-row IngestCheckpoint table, starting from the current MAX(DateTimeStamp)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS IngestCheckpoint (
+            id TINYINT PRIMARY KEY,
+            high_water_mark DATETIME NULL,
+            updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    cursor.execute(INGEST_CHECKPOINT_SAVE_SQL)
+
+
+def migrate_run_history(cursor):
+    """Create RunHistory, one row per pipeline stage of every scraper run (see run_history.py)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS RunHistory (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            run_id CHAR(32) NOT NULL,
+            run_kind VARCHAR(16) NOT NULL,
+            run_started_at DATETIME NOT NULL,
+            status VARCHAR(16) NOT NULL,
+            stage VARCHAR(64) NOT NULL,
+            stage_order SMALLINT NOT NULL,
+            seconds DOUBLE NOT NULL,
+            row_count INT NULL,
+            round_trips INT NULL,
+            KEY idx_run_started (run_started_at),
+            KEY idx_run_id (run_id)
+        );
+    """)
+
+
+# (version, description, function(cursor)); append new migrations, never reorder
+MIGRATIONS = [
+    (1, "Baseline tables and summary unique keys", migrate_baseline),
+    (2, "ActivityCategory column; nullable TimeSinceLastActivity", migrate_activity_category),
+    (3, "Activity identity unique key and hot-query indexes", migrate_activity_keys),
+    (4, "DataVersion token for report caches", migrate_data_version),
+    (5, "FULLTEXT search indexes", migrate_search_indexes),
+    (6, "ActivityHourly rollup for the Custom Activity Report", migrate_activity_hourly),
+    (7, "IngestCheckpoint for streaming ingest", migrate_ingest_checkpoint),
+    (8, "RunHistory per-stage run timings", migrate_run_history),
+]
+
+
+def applied_versions(connection):
+    """Return the set of migration versions already applied."""
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS SchemaMigrations (
+                version INT PRIMARY KEY,
+                description VARCHAR(255) NOT NULL,
+                applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+        cursor.execute("SELECT version FROM SchemaMigrations;")
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def apply_migrations(connection):
+    """
+    Apply every pending migration in version order.
+    Returns:
+        The schema version after applying, or None if a migration failed.
+    """
+    try:
+        done = applied_versions(connection)
+    except Exception as e:
+        logging.error(f"Error reading schema version: {e}")
+        return None
+
+    version = max(done, default=0)
+    for migration_version, description, migrate in MIGRATIONS:
+        if migration_version in done:
+            continue
+        cursor = connection.cursor()
+        try:
+            logging.info(f"Applying schema migration {migration_version}: {description}")
+            migrate(cursor)
+            cursor.execute(
+                "INSERT INTO SchemaMigrations (version, description) VALUES (%s, %s);",
+                (migration_version, description),
+            )
+            connection.commit()
+            version = migration_version
+        except Exception as e:
+            connection.rollback()
+            logging.error(f"Schema migration {migration_version} failed: {e}")
+            return None
+        finally:
+            cursor.close()
+    return version
+
+
+def plan_check_queries(connection):
+    """
+    Build (label, sql, params) for the hot queries, using the most recent activity's values.
+    Mirrors fetch_activities, fetch_table_data, search and the per-run rollup updater.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT Name, DateTimeStamp, id FROM ExtractedActivities ORDER BY DateTimeStamp DESC, id DESC LIMIT 1;")
+        row = cursor.fetchone() or ("Unknown", "1900-01-01 00:00:00", 0)
+    finally:
+        cursor.close()
+    name, datetime_stamp, row_id = row
+    window = ("2024-01-01 00:00:00", "2024-01-08 00:00:00")
+    return [
+        ("fetch_activities rollup (single name)", """
+            SELECT Name, ActivityCategory, SUM(ActivityCount) FROM ActivityHourly
+            WHERE Name = %s AND ActivityHour >= %s AND ActivityHour < %s
+            GROUP BY Name, ActivityCategory;
+        """, (name, *window)),
+        ("fetch_activities rollup (All)", """
+            SELECT Name, ActivityCategory, SUM(ActivityCount) FROM ActivityHourly
+            WHERE ActivityHour >= %s AND ActivityHour < %s
+            GROUP BY Name, ActivityCategory;
+        """, window),
+        ("fetch_activities edge hour (All)", """
+            SELECT Name, ActivityCategory, COUNT(*) FROM extractedActivities
+            WHERE ActivityCategory IS NOT NULL AND DateTimeStamp >= %s AND DateTimeStamp < %s
+            GROUP BY Name, ActivityCategory;
+        """, (window[0], "2024-01-01 01:00:00")),
+        ("update_hourly_rollup (touched hours)", """
+            SELECT Name, ActivityCategory, COUNT(*) FROM ExtractedActivities
+            WHERE ActivityCategory IS NOT NULL
+            AND (DateTimeStamp >= %s AND DateTimeStamp < %s + INTERVAL 1 HOUR)
+            GROUP BY Name, ActivityCategory;
+        """, (window[0], window[0])),
+        ("fetch_table_data (extractedactivities first page)", """
+            SELECT * FROM extractedactivities ORDER BY DateTimeStamp DESC, id DESC LIMIT 10;
+        """, ()),
+        ("fetch_table_data (extractedactivities next page)", """
+            SELECT * FROM extractedactivities
+            WHERE (DateTimeStamp < %s OR (DateTimeStamp = %s AND id < %s))
+            ORDER BY DateTimeStamp DESC, id DESC LIMIT 10;
+        """, (datetime_stamp, datetime_stamp, row_id)),
+        ("search (extractedactivities)", """
+            SELECT COUNT(*) FROM extractedactivities
+            WHERE MATCH(Name, ActivityType, TicketUrl) AGAINST(%s IN BOOLEAN MODE);
+        """, (f"+{name.split()[0]}*",)),
+        ("search (extractedactivities date)", """
+            SELECT COUNT(*) FROM extractedactivities
+            WHERE DateTimeStamp >= %s AND DateTimeStamp < %s;
+        """, window),
+    ]
+
+
+def check_query_plans(connection):
+    """
+    EXPLAIN the hot queries and report any full table scan of a large table.
+    Plans depend on table statistics, so run this against production-sized data.
+    Returns:
+        List of (label, table) pairs that were fully scanned; empty when all plans use indexes.
+    """
+    failures = []
+    cursor = connection.cursor(dictionary=True)
+    try:
+        for label, query, params in plan_check_queries(connection):
+            cursor.execute("EXPLAIN " + query.strip(), params)
+            for step in cursor.fetchall():
+                table = (step.get("table") or "").lower()
+                if step.get("type") == "ALL" and table and not table.startswith("<") and table not in SMALL_TABLES:
+                    failures.append((label, table))
+                    logging.error(f"Full table scan of {table} in {label} (~{step.get('rows')} rows).")
+                else:
+                    logging.info(f"{label}: {table} via {step.get('type')} on {step.get('key')}")
+    finally:
+        cursor.close()
+    return failures
+
+
+if __name__ == "__main__":
+    from desk_db import get_db_connection
+
+    parser = argparse.ArgumentParser(description="Create or upgrade the TicketActivityDB schema.")
+    parser.add_argument("--status", action="store_true", help="Show applied migration versions and exit.")
+    parser.add_argument("--check-plans", action="store_true",
+                        help="EXPLAIN the hot queries and exit non-zero if any does a full table scan.")
+    args = parser.parse_args()
+
+    db_connection = get_db_connection()
+    if not db_connection:
+        sys.exit(1)
+    try:
+        if args.status:
+            versions = sorted(applied_versions(db_connection))
+            pending = [version for version, _, _ in MIGRATIONS if version not in versions]
+            print(f"Applied: {versions or 'none'}; pending: {pending or 'none'}")
+        elif args.check_plans:
+            sys.exit(1 if check_query_plans(db_connection) else 0)
+        else:
+            sys.exit(0 if apply_migrations(db_connection) is not None else 1)
+    finally:
+        db_connection.close()
@@ -0,0 +1,28 @@
+"""Analytics cache round trip over chunks whose inferred column types would differ."""
+from datetime import date, datetime
+
+import pytest
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("duckdb")
+
+import analytics_cache  # noqa: E402
+
+
+def activity(row_id, category):
+    timestamp = datetime(2024, 3, 1, 9, row_id)
+    return (row_id, "Alice", "Note added", category, timestamp, f"https://desk/tickets/{row_id}", date(2024, 3, 1))
+
+
+def test_null_category_chunk_followed_by_categorised_chunk(tmp_path):
+    activities_dir = tmp_path / "activities"
+    analytics_cache._write_chunk(str(activities_dir), [activity(1, None), activity(2, None)])
+    analytics_cache._write_chunk(str(activities_dir), [activity(3, "Notes"), activity(4, "Notes")])
+
+    assert analytics_cache._compact_partitions(str(activities_dir), max_files=1) == 1
+    analytics_cache._write_sync_state(str(tmp_path), {
+        "last_id": 4, "rows": 4, "format": analytics_cache.CACHE_FORMAT, "synced_at": "2024-03-01T10:00:00",
+    })
+
+    counts = analytics_cache.cached_activity_counts(str(tmp_path), "All", expected_last_id=4)
+    assert counts == [("Alice", "Notes", 2)]